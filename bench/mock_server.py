@@ -0,0 +1,345 @@
+import argparse
+import io
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from PIL import Image
+
+# Local stand-in for the Amadeus, Ticketmaster, OpenWeather and Google Places endpoints
+# used by the dashboard. Point the app at it with TRAVEL_DASHBOARD_API_BASE_URL. Every
+# route serves a synthetic payload shaped like the real API, or a recorded one from
+# --payload-dir, after a configurable latency, and can inject error responses.
+
+ROUTES = {
+    "/v1/security/oauth2/token": "amadeus_token",
+    "/v2/shopping/flight-offers": "amadeus_offers",
+    "/discovery/v2/events.json": "ticketmaster",
+    "/data/2.5/forecast": "openweather",
+    "/maps/api/place/nearbysearch/json": "places_nearby",
+    "/maps/api/place/photo": "places_photo",
+}
+
+API_OF_ROUTE = {
+    "amadeus_token": "amadeus",
+    "amadeus_offers": "amadeus",
+    "ticketmaster": "ticketmaster",
+    "openweather": "openweather",
+    "places_nearby": "google_places",
+    "places_photo": "google_places",
+}
+
+MAX_FLIGHT_OFFERS = 249
+FORECAST_SLOTS = 40
+PLACES_PAGE_SIZE = 20
+CARRIERS = {"AA": "American Airlines", "DL": "Delta Air Lines", "UA": "United Airlines",
+            "B6": "JetBlue Airways", "AS": "Alaska Airlines", "WN": "Southwest Airlines"}
+HUBS = ["ORD", "DFW", "ATL", "DEN", "PHX", "SEA"]
+WEATHER_DESCRIPTIONS = ["clear sky", "few clouds", "scattered clouds", "broken clouds",
+                        "overcast clouds", "light rain", "rain"]
+
+
+class MockConfig:
+    def __init__(self, latency=0.0, jitter=0.0, api_latency=None, error_rate=0.0, error_status=503,
+                 event_pages=5, places_pages=3, payload_dir=None, seed=0):
+        self.latency = latency  # seconds added to every response
+        self.jitter = jitter  # uniform extra seconds on top of the latency
+        self.api_latency = api_latency or {}  # per-API latency overriding the default
+        self.error_rate = error_rate  # share of requests answered with error_status
+        self.error_status = error_status
+        self.event_pages = event_pages
+        self.places_pages = places_pages
+        self.payload_dir = payload_dir
+        self.random = random.Random(seed)
+
+
+# Synthetic payloads
+
+def _iso(moment):
+    return moment.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def _segment(origin, destination, carrier, departure, minutes, number):
+    arrival = departure + timedelta(minutes=minutes)
+    return {
+        "departure": {"iataCode": origin, "at": _iso(departure)},
+        "arrival": {"iataCode": destination, "at": _iso(arrival)},
+        "carrierCode": carrier,
+        "number": str(number),
+        "aircraft": {"code": "321"},
+        "duration": f"PT{minutes // 60}H{minutes % 60}M",
+    }
+
+
+def _itinerary(origin, destination, day, rng, stops):
+    departure = datetime.combine(day, datetime.min.time()) + timedelta(minutes=rng.randrange(5 * 60, 22 * 60, 5))
+    carrier = rng.choice(list(CARRIERS))
+    airports = [origin] + rng.sample(HUBS, stops) + [destination]
+    segments = []
+    for leg_origin, leg_destination in zip(airports, airports[1:]):
+        minutes = rng.randrange(60, 300, 5)
+        segments.append(_segment(leg_origin, leg_destination, carrier, departure, minutes, rng.randrange(100, 9999)))
+        departure += timedelta(minutes=minutes + rng.randrange(45, 180, 5))
+    total = (datetime.fromisoformat(segments[-1]["arrival"]["at"])
+             - datetime.fromisoformat(segments[0]["departure"]["at"]))
+    minutes = int(total.total_seconds() // 60)
+    return {"duration": f"PT{minutes // 60}H{minutes % 60}M", "segments": segments}
+
+
+def flight_offers_payload(params, rng):
+    origin = params.get("originLocationCode", "JFK")
+    destination = params.get("destinationLocationCode", "LAX")
+    departure_day = datetime.strptime(params.get("departureDate", "2030-01-01"), "%Y-%m-%d").date()
+    return_day = params.get("returnDate")
+    count = min(int(params.get("max", MAX_FLIGHT_OFFERS)), MAX_FLIGHT_OFFERS)
+    offers = []
+    for number in range(count):
+        itineraries = [_itinerary(origin, destination, departure_day, rng, rng.choice([0, 0, 1, 1, 2]))]
+        if return_day:
+            day = datetime.strptime(return_day, "%Y-%m-%d").date()
+            itineraries.append(_itinerary(destination, origin, day, rng, rng.choice([0, 1, 1, 2])))
+        price = f"{rng.uniform(89, 1400):.2f}"
+        offers.append({"type": "flight-offer", "id": str(number + 1), "itineraries": itineraries,
+                       "price": {"currency": "USD", "total": price, "grandTotal": price}})
+    return {"data": offers, "dictionaries": {"carriers": CARRIERS, "aircraft": {"321": "AIRBUS A321"}}}
+
+
+def ticketmaster_payload(params, config):
+    page = int(params.get("page", 0))
+    size = int(params.get("size", 20))
+    category = params.get("classificationName", "Music")
+    start = datetime.strptime(params.get("startDateTime", "2030-01-01T00:00:00Z"), "%Y-%m-%dT%H:%M:%SZ")
+    end = datetime.strptime(params.get("endDateTime", "2030-01-31T00:00:00Z"), "%Y-%m-%dT%H:%M:%SZ")
+    days = max((end - start).days, 1)
+    # event_pages is the result count of a 30-day search; narrower searches find fewer
+    total_pages = max(1, round(config.event_pages * days / 30))
+    rng = random.Random(f"{category}-{page}")
+    events = []
+    for number in range(size):
+        venue = rng.randrange(40)
+        day = start + timedelta(days=rng.randrange(days))
+        # A share of events is listed under every classification, as on the real API
+        event_id = f"shared-{page}-{number}" if number % 10 == 0 else f"{category}-{page}-{number}"
+        events.append({
+            "id": event_id,
+            "name": f"{category} Event {page * size + number}",
+            "url": f"https://example.com/events/{event_id}",
+            "images": [{"url": f"https://example.com/images/{event_id}.jpg"}],
+            "dates": {"start": {"localDate": day.strftime("%Y-%m-%d"), "localTime": "19:30:00"}},
+            "_embedded": {"venues": [{
+                "name": f"Venue {venue}",
+                "address": {"line1": f"{venue} Main Street"},
+                "location": {"latitude": f"{40.70 + venue * 0.002:.4f}", "longitude": f"{-74.00 + venue * 0.002:.4f}"},
+            }]},
+        })
+    return {"_embedded": {"events": events},
+            "page": {"size": size, "totalElements": size * total_pages,
+                     "totalPages": total_pages, "number": page}}
+
+
+def forecast_payload(params):
+    rng = random.Random(params.get("q", ""))
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    start = now - timedelta(hours=now.hour % 3)
+    slots = []
+    for number in range(FORECAST_SLOTS):
+        moment = start + timedelta(hours=3 * number)
+        temp = 12 + 6 * rng.random() + 4 * ((number % 8) in (3, 4, 5))
+        slot = {
+            "dt": int(moment.timestamp()),
+            "dt_txt": moment.strftime("%Y-%m-%d %H:%M:%S"),
+            "main": {"temp": round(temp, 2), "temp_min": round(temp - 1.5, 2), "temp_max": round(temp + 1.5, 2),
+                     "humidity": rng.randrange(40, 95)},
+            "weather": [{"description": rng.choice(WEATHER_DESCRIPTIONS)}],
+            "wind": {"speed": round(rng.uniform(0.5, 12), 2)},
+        }
+        if "rain" in slot["weather"][0]["description"]:
+            slot["rain"] = {"3h": round(rng.uniform(0.1, 6), 2)}
+        slots.append(slot)
+    return {"cod": "200", "cnt": FORECAST_SLOTS, "list": slots,
+            "city": {"name": params.get("q", ""), "timezone": rng.choice([-18000, 0, 3600, 32400])}}
+
+
+def places_payload(params, config):
+    token = params.get("pagetoken")
+    if token:
+        location, page = token.rsplit("|", 1)
+        page = int(page)
+    else:
+        location, page = params.get("location", "0,0"), 0
+    lat, lng = (float(value) for value in location.split(","))
+    rng = random.Random(f"{location}-{page}")
+    results = []
+    for number in range(PLACES_PAGE_SIZE):
+        place_id = f"{location}-{page}-{number}"
+        results.append({
+            "place_id": place_id,
+            "name": f"Hotel {page * PLACES_PAGE_SIZE + number}",
+            "rating": round(rng.uniform(2.5, 5), 1),
+            "price_level": rng.randrange(1, 5),
+            "vicinity": f"{number} Hotel Street",
+            "geometry": {"location": {"lat": lat + rng.uniform(-0.02, 0.02), "lng": lng + rng.uniform(-0.02, 0.02)}},
+            "photos": [{"photo_reference": f"photo-{place_id}", "width": 1200, "height": 800}],
+        })
+    payload = {"status": "OK", "results": results}
+    if page + 1 < config.places_pages:
+        payload["next_page_token"] = f"{location}|{page + 1}"
+    return payload
+
+
+_photo = None
+
+
+def photo_payload():
+    global _photo
+    if _photo is None:
+        image = Image.new("RGB", (400, 300), (70, 130, 180))
+        output = io.BytesIO()
+        image.save(output, format="JPEG", quality=85)
+        _photo = output.getvalue()
+    return _photo
+
+
+class MockServer:
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        self.config = config or MockConfig()
+        self.calls = Counter()  # requests received per route
+        self.errors = Counter()  # injected errors per route
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_counts(self):
+        with self._lock:
+            self.calls.clear()
+            self.errors.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.calls), dict(self.errors)
+
+    def _recorded(self, route):
+        if not self.config.payload_dir:
+            return None
+        path = os.path.join(self.config.payload_dir, f"{route}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as payload_file:
+            return json.load(payload_file)
+
+    def respond(self, route, params, body):
+        config = self.config
+        with self._lock:
+            self.calls[route] += 1
+            rng_value = config.random.random()
+            jitter = config.random.uniform(0, config.jitter) if config.jitter else 0.0
+        time.sleep(config.api_latency.get(API_OF_ROUTE[route], config.latency) + jitter)
+        if rng_value < config.error_rate:
+            with self._lock:
+                self.errors[route] += 1
+            return config.error_status, "application/json", b'{"errors": [{"detail": "injected"}]}'
+
+        if route == "places_photo":
+            return 200, "image/jpeg", photo_payload()
+        payload = self._recorded(route)
+        if payload is None:
+            if route == "amadeus_token":
+                payload = {"access_token": "mock-token", "token_type": "Bearer", "expires_in": 1799}
+            elif route == "amadeus_offers":
+                payload = flight_offers_payload(params, random.Random(json.dumps(params, sort_keys=True)))
+            elif route == "ticketmaster":
+                payload = ticketmaster_payload(params, config)
+            elif route == "openweather":
+                payload = forecast_payload(params)
+            else:
+                payload = places_payload(params, config)
+        return 200, "application/json", json.dumps(payload).encode()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _serve(self):
+                parts = urlsplit(self.path)
+                params = {name: values[-1] for name, values in parse_qs(parts.query).items()}
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                route = ROUTES.get(parts.path)
+                if route is None:
+                    status, content_type, data = 404, "application/json", b"{}"
+                else:
+                    status, content_type, data = server.respond(route, params, body)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = _serve
+            do_POST = _serve
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def parse_api_latency(values):
+    latencies = {}
+    for value in values or []:
+        api, seconds = value.split("=", 1)
+        latencies[api] = float(seconds)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve stand-in responses for the dashboard's upstream APIs.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.02, help="uniform extra seconds per response")
+    parser.add_argument("--api-latency", action="append", metavar="API=SECONDS",
+                        help="per-API latency, e.g. amadeus=0.4 (repeatable)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--event-pages", type=int, default=5, help="result pages of a 30-day event search")
+    parser.add_argument("--places-pages", type=int, default=3)
+    parser.add_argument("--payload-dir", help="directory of recorded <route>.json payloads to replay")
+    args = parser.parse_args()
+
+    config = MockConfig(latency=args.latency, jitter=args.jitter, api_latency=parse_api_latency(args.api_latency),
+                        error_rate=args.error_rate, error_status=args.error_status, event_pages=args.event_pages,
+                        places_pages=args.places_pages, payload_dir=args.payload_dir)
+    server = MockServer(config, args.host, args.port)
+    print(f"Mock APIs on {server.url} - run the app with TRAVEL_DASHBOARD_API_BASE_URL={server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from streamlit import logger as streamlit_logger
+
+from mock_server import MockConfig, MockServer, parse_api_latency
+
+# Offline benchmarks for the dashboard. A local mock server stands in for all four
+# upstream APIs, the app's fetch functions and full Streamlit page reruns (AppTest) are
+# driven against it, and latency percentiles, upstream calls and peak memory are
+# reported and saved as JSON. Compare a run against an earlier one with --compare:
+#
+#   python bench/run_benchmarks.py --output bench/results/before.json
+#   python bench/run_benchmarks.py --compare bench/results/before.json
+#
+# "cold" scenarios clear the response cache before every iteration, "warm" ones keep it.
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_DIR, "bench", "results")
+
+PAGES = {
+    "home": "🏠 Home - Overview",
+    "flights": "✈️ Flights - Book Your Travel",
+    "hotels": "🏨 Hotels - Find Accommodations",
+    "events": "🎉 Events - Find Local Happenings",
+    "weather": "🌦️ Weather Forecast - Check Weather",
+}
+EVENT_CATEGORIES = ["Music", "Sports", "Arts & Theatre"]
+BURST_SESSIONS = 16
+REGRESSION_THRESHOLD = 0.10  # relative increase flagged by --compare
+
+
+# Function to create a working directory with the files the app expects in its cwd
+def prepare_workspace(directory, num_cities=5000):
+    rng = random.Random(0)
+    cities = [("Tokyo", "Japan", 35.6897, 139.6922, 37732000), ("New York", "United States", 40.6943, -73.9249, 18908608),
+              ("Paris", "France", 48.8567, 2.3522, 11060000), ("London", "United Kingdom", 51.5072, -0.1275, 11262000)]
+    syllables = ["ka", "lo", "mi", "ra", "to", "ne", "sa", "vi", "do", "ber", "ton", "ville", "burg"]
+    while len(cities) < num_cities:
+        name = "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))).title()
+        cities.append((name, rng.choice(["Japan", "France", "Brazil", "India", "Canada"]),
+                       rng.uniform(-60, 70), rng.uniform(-180, 180), rng.randint(1000, 2000000)))
+    with open(os.path.join(directory, "worldcities.csv"), "w", encoding="utf-8") as csv_file:
+        csv_file.write("city,city_ascii,lat,lng,country,iso2,iso3,admin_name,capital,population,id\n")
+        for number, (name, country, lat, lng, population) in enumerate(cities):
+            csv_file.write(f"{name},{name},{lat:.4f},{lng:.4f},{country},XX,XXX,{name},,{population},{number}\n")
+    os.makedirs(os.path.join(directory, ".streamlit"), exist_ok=True)
+    with open(os.path.join(directory, ".streamlit", "secrets.toml"), "w") as secrets_file:
+        for name in ["google_key", "ticketmaster_key", "openweather_key", "client_key", "secret_key"]:
+            secrets_file.write(f'{name} = "bench-{name}"\n')
+
+
+def percentile_summary(durations):
+    values = np.array(durations) * 1000
+    return {
+        "iterations": len(values),
+        "mean_ms": round(float(values.mean()), 2),
+        "p50_ms": round(float(np.percentile(values, 50)), 2),
+        "p95_ms": round(float(np.percentile(values, 95)), 2),
+        "max_ms": round(float(values.max()), 2),
+    }
+
+
+# Function to time a scenario. setup() runs untimed before every iteration and its
+# upstream calls are not counted; one extra traced iteration measures peak Python memory
+# without slowing down the timed ones.
+def run_scenario(server, run, setup=None, iterations=10):
+    durations = []
+    calls, errors = Counter(), Counter()
+    for _ in range(iterations):
+        if setup:
+            setup()
+        server.reset_counts()
+        started = time.perf_counter()
+        run()
+        durations.append(time.perf_counter() - started)
+        run_calls, run_errors = server.snapshot()
+        calls.update(run_calls)
+        errors.update(run_errors)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    summary = percentile_summary(durations)
+    summary["calls_per_iteration"] = {route: round(count / iterations, 2) for route, count in sorted(calls.items())}
+    summary["upstream_calls"] = round(sum(calls.values()) / iterations, 2)
+    summary["injected_errors"] = sum(errors.values())
+    summary["peak_memory_mb"] = round(peak / 2 ** 20, 2)
+    return summary
+
+
+# Function scenarios calling the app's fetch and display functions directly
+def function_scenarios(cache):
+    from travel_dashboard.api import openweather
+    from travel_dashboard.data import flight_offers
+    from travel_dashboard.pages import common, events as events_page, flights as flights_page, hotels as hotels_page
+    from travel_dashboard.pages import weather as weather_page
+
+    start = datetime.combine(date.today() + timedelta(days=7), datetime.min.time())
+    departure = date.today() + timedelta(days=30)
+
+    def events():
+        events_page.get_all_events("New York", start, start + timedelta(days=30), EVENT_CATEGORIES)
+
+    # A search refined after the first one: one more week and one more category. Only
+    # the new days and the new category are fetched.
+    def events_refined():
+        events_page.get_all_events("New York", start, start + timedelta(days=37), EVENT_CATEGORIES + ["Comedy"])
+
+    def search_events_first():
+        clear_cache()
+        events()
+
+    def flights():
+        token = flights_page.get_amadeus_token()
+        data, dictionaries = flights_page.get_flights(token, "JFK", "LAX", departure, departure + timedelta(days=7),
+                                                      1, "ECONOMY", "Round-Trip")
+        flight_offers.flatten_offers(data, dictionaries)
+
+    def hotels():
+        hotels_page.get_hotels("40.7128,-74.0060")
+
+    # Identical lookups from many sessions at once share one upstream call
+    def weather_burst():
+        with ThreadPoolExecutor(max_workers=BURST_SESSIONS) as executor:
+            list(executor.map(openweather.fetch_weather_data, ["Tokyo"] * BURST_SESSIONS))
+
+    def weather():
+        weather_data = openweather.fetch_weather_data("Tokyo")
+        weather_page.display_three_day_outlook(weather_data)
+        weather_page.display_forecast_line_graph(weather_data)
+        weather_page.display_long_term_outlook(weather_data)
+
+    def clear_cache():
+        cache.clear()
+        common.load_forecast.clear()
+
+    scenarios = {}
+    for name, run in [("events", events), ("flights", flights), ("hotels", hotels), ("weather", weather),
+                      ("weather_burst", weather_burst)]:
+        scenarios[f"{name}_cold"] = (run, clear_cache)
+        scenarios[f"{name}_warm"] = (run, None)
+    scenarios["events_refine"] = (events_refined, search_events_first)
+    return scenarios
+
+
+# Full-page rerun scenarios through Streamlit's AppTest, with the cache kept warm
+def page_scenarios(timeout):
+    from streamlit.testing.v1 import AppTest
+
+    def page_run(page, click_search=False):
+        def run():
+            app_test = AppTest.from_file(os.path.join(REPO_DIR, "main.py"), default_timeout=timeout)
+            app_test.run()
+            app_test.sidebar.radio[0].set_value(PAGES[page]).run()
+            if click_search:
+                app_test.button[0].click().run()
+            if app_test.exception:
+                raise RuntimeError(f"{page} page raised: {app_test.exception[0].value}")
+        return run
+
+    return {
+        "page_home": (page_run("home"), None),
+        "page_weather": (page_run("weather"), None),
+        "page_events": (page_run("events"), None),
+        "page_hotels": (page_run("hotels", click_search=True), None),
+        "page_flights": (page_run("flights", click_search=True), None),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results):
+    print(f"{'scenario':<20}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'calls':>8}{'peak MB':>9}")
+    for name, summary in results.items():
+        print(f"{name:<20}{summary['p50_ms']:>10.1f}{summary['p95_ms']:>10.1f}{summary['max_ms']:>10.1f}"
+              f"{summary['upstream_calls']:>8.1f}{summary['peak_memory_mb']:>9.1f}")
+
+
+# Function to print the change of every metric against a baseline run. Returns the
+# names of the scenarios that got worse by more than the threshold.
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    regressions = []
+    print(f"\nCompared with {baseline['meta'].get('commit')} ({baseline['meta'].get('timestamp')}):")
+    print(f"{'scenario':<20}{'p50':>10}{'p95':>10}{'calls':>10}{'peak MB':>10}")
+    for name, summary in results.items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            print(f"{name:<20}{'new':>10}")
+            continue
+        changes = []
+        worse = False
+        for metric in ["p50_ms", "p95_ms", "upstream_calls", "peak_memory_mb"]:
+            old, new = before[metric], summary[metric]
+            change = (new - old) / old if old else (0.0 if new == old else float("inf"))
+            worse = worse or change > threshold
+            changes.append(f"{change:+.0%}")
+        print(f"{name:<20}" + "".join(f"{change:>10}" for change in changes) + ("  REGRESSION" if worse else ""))
+        if worse:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard against local stand-in APIs.")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--page-iterations", type=int, default=3, help="iterations of every AppTest page scenario")
+    parser.add_argument("--scenarios", nargs="*", help="only run scenarios whose name starts with one of these")
+    parser.add_argument("--skip-pages", action="store_true", help="skip the AppTest page reruns")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every mock response")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--api-latency", action="append", metavar="API=SECONDS")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--event-pages", type=int, default=5, help="result pages of a 30-day event search")
+    parser.add_argument("--payload-dir", help="directory of recorded <route>.json payloads to replay")
+    parser.add_argument("--output", help="results file (default: bench/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+    # Paths are relative to where the benchmark was started, not to the workspace below
+    for name in ["output", "compare", "payload_dir"]:
+        if getattr(args, name):
+            setattr(args, name, os.path.abspath(getattr(args, name)))
+
+    config = MockConfig(latency=args.latency, jitter=args.jitter, api_latency=parse_api_latency(args.api_latency),
+                        error_rate=args.error_rate, error_status=args.error_status, event_pages=args.event_pages,
+                        payload_dir=args.payload_dir)
+    server = MockServer(config).start()
+
+    # The app reads these at import time, and worldcities.csv/secrets from its cwd
+    workspace = tempfile.mkdtemp(prefix="travel-dashboard-bench-")
+    prepare_workspace(workspace)
+    os.environ["TRAVEL_DASHBOARD_API_BASE_URL"] = server.url
+    os.environ["TRAVEL_DASHBOARD_CACHE_DIR"] = os.path.join(workspace, "cache")
+    os.chdir(workspace)
+    sys.path.insert(0, REPO_DIR)
+    # Bare-mode calls outside a Streamlit server log a warning each; keep the report readable
+    streamlit_logger.set_log_level(logging.ERROR)
+
+    # Building the function scenarios imports every page module
+    import_started = time.perf_counter()
+    from travel_dashboard.api.response_cache import get_response_cache
+    scenarios = function_scenarios(get_response_cache())
+    import_seconds = time.perf_counter() - import_started
+    if not args.skip_pages:
+        scenarios.update(page_scenarios(timeout=60))
+    if args.scenarios:
+        scenarios = {name: scenario for name, scenario in scenarios.items()
+                     if any(name.startswith(prefix) for prefix in args.scenarios)}
+
+    results = {}
+    try:
+        for name, (run, setup) in scenarios.items():
+            iterations = args.page_iterations if name.startswith("page_") else args.iterations
+            results[name] = run_scenario(server, run, setup, iterations)
+            print(f"  {name}: p50 {results[name]['p50_ms']:.1f} ms", file=sys.stderr)
+    finally:
+        server.stop()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "import_ms": round(import_seconds * 1000, 2),
+            "mock": {"latency": args.latency, "jitter": args.jitter, "api_latency": config.api_latency,
+                     "error_rate": args.error_rate, "error_status": args.error_status,
+                     "event_pages": args.event_pages, "payload_dir": args.payload_dir},
+        },
+        "scenarios": results,
+    }
+    print_report(results)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"\nSaved results to {output}")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
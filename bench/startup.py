@@ -0,0 +1,110 @@
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Cold start and first-render times of every page. Each measurement runs in a fresh
+# Python process so module imports are paid again:
+#
+#   cold_start_ms  first rerun of the app (the Home page), imports included
+#   first_open_ms  first rerun after switching from Home to the page
+#   rerun_ms       the next rerun of the same page
+#
+# and lists which heavy libraries were loaded after the Home page was drawn. Run it
+# against another checkout with --app-dir to compare layouts:
+#
+#   python bench/startup.py --app-dir /path/to/old/checkout --output before.json
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+HEAVY_MODULES = ["plotly.express", "folium", "streamlit_folium"]
+
+
+def child(app_dir, page):
+    started = time.perf_counter()
+    from streamlit import logger as streamlit_logger
+    from streamlit.testing.v1 import AppTest
+    streamlit_import = time.perf_counter() - started
+    streamlit_logger.set_log_level(logging.ERROR)
+
+    sys.path.insert(0, BENCH_DIR)
+    from mock_server import MockConfig, MockServer
+    from run_benchmarks import PAGES, prepare_workspace
+
+    server = MockServer(MockConfig(latency=0.0, jitter=0.0)).start()
+    workspace = tempfile.mkdtemp(prefix="travel-dashboard-startup-")
+    prepare_workspace(workspace)
+    os.environ["TRAVEL_DASHBOARD_API_BASE_URL"] = server.url
+    os.environ["TRAVEL_DASHBOARD_CACHE_DIR"] = os.path.join(workspace, "cache")
+    os.chdir(workspace)
+
+    app_test = AppTest.from_file(os.path.join(app_dir, "main.py"), default_timeout=60)
+    started = time.perf_counter()
+    app_test.run()
+    cold_start = time.perf_counter() - started
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+
+    result = {"streamlit_import_ms": streamlit_import * 1000, "cold_start_ms": cold_start * 1000,
+              "heavy_modules_after_home": loaded}
+    if page != "home":
+        started = time.perf_counter()
+        app_test.sidebar.radio[0].set_value(PAGES[page]).run()
+        result["first_open_ms"] = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    app_test.run()
+    result["rerun_ms"] = (time.perf_counter() - started) * 1000
+    if app_test.exception:
+        result["exception"] = str(app_test.exception[0].value)
+    server.stop()
+    print(json.dumps(result))
+
+
+def measure(app_dir, page, runs):
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", page, "--app-dir", app_dir],
+                                capture_output=True, text=True, check=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    summary = {name: round(statistics.median(sample[name] for sample in samples), 1)
+               for name in samples[0] if name.endswith("_ms")}
+    summary["heavy_modules_after_home"] = samples[0]["heavy_modules_after_home"]
+    if any("exception" in sample for sample in samples):
+        summary["exception"] = next(sample["exception"] for sample in samples if "exception" in sample)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold start and first render time of every page.")
+    parser.add_argument("--app-dir", default=REPO_DIR, help="checkout whose main.py is measured")
+    parser.add_argument("--runs", type=int, default=3, help="fresh processes per page (the median is reported)")
+    parser.add_argument("--pages", nargs="*", help="only measure these pages")
+    parser.add_argument("--output", help="also save the results as JSON")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    app_dir = os.path.abspath(args.app_dir)
+    if args.child:
+        child(app_dir, args.child)
+        return
+
+    sys.path.insert(0, BENCH_DIR)
+    from run_benchmarks import PAGES
+
+    results = {page: measure(app_dir, page, args.runs) for page in (args.pages or PAGES)}
+    print(f"{'page':<10}{'cold start':>12}{'first open':>12}{'rerun':>10}  heavy modules after Home")
+    for page, summary in results.items():
+        first_open = f"{summary['first_open_ms']:.0f}" if "first_open_ms" in summary else "-"
+        print(f"{page:<10}{summary['cold_start_ms']:>12.0f}{first_open:>12}{summary['rerun_ms']:>10.0f}  "
+              f"{', '.join(summary['heavy_modules_after_home']) or '-'}"
+              + (f"  ERROR: {summary['exception']}" if "exception" in summary else ""))
+    if args.output:
+        with open(os.path.abspath(args.output), "w") as output_file:
+            json.dump({"app_dir": app_dir, "runs": args.runs, "pages": results}, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+import os
+
+# Travel Dashboard package, in three layers:
+#   api/   upstream clients (HTTP, response cache, one module per API); no Streamlit calls
+#   data/  transforms from API payloads into DataFrames, indexes and map layers
+#   pages/ one Streamlit module per page, imported the first time the page is opened
+# main.py only draws the sidebar and dispatches to the selected page, so libraries such
+# as plotly and folium are loaded by the pages that use them, not on every start.
+# warmer.py and batch.py run the api/ and data/ layers headless, without Streamlit.
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get("TRAVEL_DASHBOARD_CACHE_DIR", os.path.join(os.path.dirname(PACKAGE_DIR), ".cache"))
@@ -0,0 +1,190 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+from travel_dashboard import metrics
+from travel_dashboard.api import http_client
+from travel_dashboard.api.credentials import get_secret
+from travel_dashboard.api.response_cache import get_response_cache
+
+# Amadeus Self-Service (test environment): OAuth tokens and flight offer searches.
+
+TOKEN_URL = "https://test.api.amadeus.com/v1/security/oauth2/token"
+FLIGHT_OFFERS_URL = "https://test.api.amadeus.com/v2/shopping/flight-offers"
+MAX_OFFERS = 249
+
+
+# Function to retrieve a new Amadeus token and its lifetime in seconds
+@metrics.timed("api")
+def fetch_amadeus_token():
+    data = {
+        "grant_type": "client_credentials",
+        "client_id": get_secret("client_key"),
+        "client_secret": get_secret("secret_key")
+    }
+    response = http_client.post("amadeus", TOKEN_URL, data=data)
+    response.raise_for_status()
+    payload = response.json()
+    return payload["access_token"], payload.get("expires_in", 1799)
+
+
+# Keeps the Amadeus token until shortly before it expires. Once the token enters the
+# refresh margin it is renewed in a background thread while callers keep using it,
+# and only one refresh runs at a time no matter how many sessions ask for a token.
+class AmadeusTokenProvider:
+    REFRESH_MARGIN = 300  # seconds before expiry to start a background refresh
+    EXPIRY_SKEW = 30  # seconds before expiry after which the token is no longer handed out
+
+    def __init__(self, fetch_token):
+        self._fetch_token = fetch_token
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._token = None
+        self._expires_at = 0.0
+
+    def _current(self):
+        with self._lock:
+            return self._token, self._expires_at
+
+    def _store(self, token, expires_in):
+        with self._lock:
+            self._token = token
+            self._expires_at = time.monotonic() + expires_in
+
+    def get_token(self):
+        token, expires_at = self._current()
+        now = time.monotonic()
+        if token and now < expires_at - self.EXPIRY_SKEW:
+            if now >= expires_at - self.REFRESH_MARGIN:
+                self._refresh_in_background()
+            return token
+        return self.refresh(stale_token=token)
+
+    # Blocks until a token other than stale_token is available. Callers that queued up
+    # behind another refresh reuse its result instead of fetching again.
+    def refresh(self, stale_token=None):
+        with self._refresh_lock:
+            token, expires_at = self._current()
+            if token and token != stale_token and time.monotonic() < expires_at - self.EXPIRY_SKEW:
+                return token
+            self._store(*self._fetch_token())
+            return self._current()[0]
+
+    def _refresh_in_background(self):
+        if not self._refresh_lock.acquire(blocking=False):
+            return  # a refresh is already running
+
+        def run():
+            try:
+                self._store(*self._fetch_token())
+            except (requests.exceptions.RequestException, KeyError, ValueError):
+                pass  # keep the current token; the next caller after expiry retries in the foreground
+            finally:
+                self._refresh_lock.release()
+
+        threading.Thread(target=run, name="amadeus-token-refresh", daemon=True).start()
+
+
+_token_provider = None
+_token_provider_lock = threading.Lock()
+
+
+# One token provider per process, shared by every Streamlit session
+def get_token_provider():
+    global _token_provider
+    with _token_provider_lock:
+        if _token_provider is None:
+            _token_provider = AmadeusTokenProvider(fetch_amadeus_token)
+        return _token_provider
+
+
+# Send an Amadeus GET, retrying once with a fresh token when the current one is rejected
+def amadeus_get(token, url, params):
+    response = http_client.get("amadeus", url, headers={"Authorization": f"Bearer {token}"}, params=params)
+    if response.status_code == 401:
+        # The token was revoked or expired early: retry once with a fresh one
+        try:
+            token = get_token_provider().refresh(stale_token=token)
+        except (requests.exceptions.RequestException, KeyError, ValueError):
+            token = None
+        if token:
+            response = http_client.get("amadeus", url, headers={"Authorization": f"Bearer {token}"}, params=params)
+    return response
+
+
+# Function to search for flights using the retrieved token. Returns (offers, dictionaries)
+# and raises requests exceptions when the search fails.
+@metrics.timed("api")
+def search_flights(token, origin, destination, departure_date, return_date, num_passengers, travel_class, trip_type):
+    params = {
+        "originLocationCode": origin,
+        "destinationLocationCode": destination,
+        "departureDate": departure_date,
+        "adults": num_passengers,
+        "travelClass": travel_class,
+        "currencyCode": "USD",
+        "max": MAX_OFFERS
+    }
+    if trip_type == "Round-Trip" and return_date:
+        params["returnDate"] = return_date
+
+    def load():
+        response = amadeus_get(token, FLIGHT_OFFERS_URL, params)
+        if response.status_code != 200:
+            raise requests.HTTPError(f"status {response.status_code}", response=response)
+        return response.json()
+
+    data = get_response_cache().fetch("amadeus", FLIGHT_OFFERS_URL, params, load)
+    return data.get("data", []), data.get("dictionaries", {})
+
+
+# Flexible-date price calendar. Every (route, date pair, class, passengers) cell is a
+# small Amadeus query whose cheapest price is cached on its own, so a cell is never
+# fetched twice while its cache entry is fresh.
+CALENDAR_OFFERS = 10  # offers per cell query; only the cheapest is kept
+CALENDAR_WORKERS = 3  # stays well under the Amadeus test limit of 10 requests/second
+
+
+# Function to fetch the cheapest price of one calendar cell (safe to call from worker threads)
+@metrics.timed("api")
+def fetch_cheapest_fare(token, origin, destination, departure_date, return_date, num_passengers, travel_class):
+    params = {
+        "originLocationCode": origin,
+        "destinationLocationCode": destination,
+        "departureDate": departure_date,
+        "returnDate": return_date,
+        "adults": num_passengers,
+        "travelClass": travel_class,
+        "currencyCode": "USD",
+        "max": CALENDAR_OFFERS
+    }
+
+    def load():
+        response = amadeus_get(token, FLIGHT_OFFERS_URL, params)
+        if response.status_code != 200:
+            raise requests.HTTPError(f"status {response.status_code}", response=response)
+        offers = response.json().get("data", [])
+        return {"price": min((float(offer["price"]["grandTotal"]) for offer in offers), default=None)}
+
+    return get_response_cache().fetch("amadeus_calendar", FLIGHT_OFFERS_URL, params, load)["price"]
+
+
+# Yields (departure_date, return_date, price, failed) for every date pair as it completes
+def iter_price_calendar(token, origin, destination, pairs, num_passengers, travel_class):
+    executor = ThreadPoolExecutor(max_workers=CALENDAR_WORKERS)
+    try:
+        futures = {
+            executor.submit(metrics.propagate(fetch_cheapest_fare), token, origin, destination, departure, back,
+                            num_passengers, travel_class): (departure, back)
+            for departure, back in pairs
+        }
+        for future in as_completed(futures):
+            departure, back = futures[future]
+            try:
+                yield departure, back, future.result(), False
+            except (requests.exceptions.RequestException, ValueError, KeyError):
+                yield departure, back, None, True
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
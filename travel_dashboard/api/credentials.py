@@ -0,0 +1,25 @@
+import os
+
+# API credentials, looked up when an API is first called instead of on every rerun.
+# Streamlit secrets (.streamlit/secrets.toml) come first; outside Streamlit, or when a
+# secret is not there, TRAVEL_DASHBOARD_<NAME> is read from the environment, e.g.
+# TRAVEL_DASHBOARD_TICKETMASTER_KEY for "ticketmaster_key".
+
+ENV_PREFIX = "TRAVEL_DASHBOARD_"
+
+
+class MissingSecret(KeyError):
+    pass
+
+
+def get_secret(name):
+    import streamlit as st
+
+    try:
+        return st.secrets[name]
+    except (KeyError, FileNotFoundError):
+        pass
+    value = os.environ.get(f"{ENV_PREFIX}{name.upper()}")
+    if value is None:
+        raise MissingSecret(f"Set {name} in .streamlit/secrets.toml or {ENV_PREFIX}{name.upper()} in the environment")
+    return value
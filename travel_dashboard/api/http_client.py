@@ -0,0 +1,159 @@
+import contextlib
+import contextvars
+import email.utils
+import math
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from travel_dashboard import metrics
+from travel_dashboard.api import rate_limit
+from travel_dashboard.api.usage import get_usage_store
+
+# Shared HTTP layer for every upstream API used by the dashboard. Each API gets one
+# pooled keep-alive Session for the lifetime of the process, its own connect/read
+# timeouts, retries with exponential backoff and jitter on 429/5xx responses, and a
+# rate limit token before every attempt (see rate_limit.py).
+
+# (connect, read) timeouts in seconds per upstream API
+API_TIMEOUTS = {
+    "amadeus": (3.05, 30),
+    "ticketmaster": (3.05, 10),
+    "openweather": (3.05, 10),
+    "google_places": (3.05, 15),
+}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5  # seconds, doubled on every attempt
+BACKOFF_CAP = 8.0
+MAX_RETRY_AFTER = 30  # give up instead of honoring a longer Retry-After
+POOL_SIZE = 16  # connections kept alive per API, enough for the concurrent fetchers
+
+# Sends every API request to one stand-in server instead, keeping the original path and
+# query (used by the offline benchmarks in bench/, e.g. "http://127.0.0.1:8765")
+BASE_URL_OVERRIDE = os.environ.get("TRAVEL_DASHBOARD_API_BASE_URL")
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+# Budget of the background work (e.g. the cache warmer) running in the current context,
+# or None for requests made on behalf of an interactive session
+_background_budget = contextvars.ContextVar("travel_dashboard_background_budget", default=None)
+
+
+# Raised instead of sending a background request that its budget refused
+class BudgetExhausted(requests.exceptions.RequestException):
+    pass
+
+
+# Context manager marking the requests sent inside it as background work. Every attempt
+# first asks budget.take(api) and then waits for a token at background priority;
+# interactive requests are counted in the usage store so background work can tell when
+# it would compete with them. When the rate limiter refuses a request, budget.refuse()
+# gets the reason.
+@contextlib.contextmanager
+def background(budget):
+    token = _background_budget.set(budget)
+    try:
+        with rate_limit.prioritized(rate_limit.BACKGROUND):
+            yield
+    finally:
+        _background_budget.reset(token)
+
+
+# Function to get the pooled session of an upstream API
+def get_session(api):
+    with _sessions_lock:
+        session = _sessions.get(api)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+            _sessions[api] = session
+        return session
+
+
+# Seconds to wait before the next attempt, or None when the server asked for too long
+def _retry_delay(response, attempt):
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    delay = _parse_retry_after(retry_after) if retry_after else None
+    if delay is not None:
+        delay = max(delay, 0.0)
+        return delay if delay <= MAX_RETRY_AFTER else None
+    # Full jitter keeps concurrent workers from retrying in lockstep; also used when the
+    # Retry-After header cannot be parsed
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+# Seconds to wait from a Retry-After header (seconds or an HTTP date), or None if malformed
+def _parse_retry_after(retry_after):
+    try:
+        delay = float(retry_after)
+    except ValueError:
+        try:
+            retry_at = email.utils.parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return None
+        if retry_at is None:
+            return None
+        delay = retry_at.timestamp() - time.time()
+    return delay if math.isfinite(delay) else None
+
+
+def _resolve(url):
+    if not BASE_URL_OVERRIDE:
+        return url
+    parts = urlsplit(url)
+    return BASE_URL_OVERRIDE.rstrip("/") + parts.path + (f"?{parts.query}" if parts.query else "")
+
+
+# Function to send a request through the pooled session of an API. Returns the final
+# response (which may still be an error status) or raises the last connection error,
+# or rate_limit.RateLimited/QuotaExhausted when no token could be had.
+def request(api, method, url, **kwargs):
+    kwargs.setdefault("timeout", API_TIMEOUTS[api])
+    session = get_session(api)
+    url = _resolve(url)
+    budget = _background_budget.get()
+    for attempt in range(MAX_RETRIES + 1):
+        if budget is not None and not budget.take(api):
+            raise BudgetExhausted(f"background budget refused a {api} request")
+        try:
+            rate_limit.get_rate_limiter().acquire(api)
+        except rate_limit.RateLimitError as error:
+            if budget is not None:
+                budget.refuse(str(error))
+            raise
+        get_usage_store().record_request(api, interactive=rate_limit.current_priority() == rate_limit.INTERACTIVE)
+        started = time.perf_counter()
+        try:
+            response = session.request(method, url, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            metrics.record_request(api, started, None, 0)
+            if attempt == MAX_RETRIES:
+                raise
+            time.sleep(_retry_delay(None, attempt))
+            continue
+        metrics.record_request(api, started, response.status_code, len(response.content))
+        if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            return response
+        delay = _retry_delay(response, attempt)
+        if delay is None:
+            return response
+        time.sleep(delay)
+
+
+def get(api, url, **kwargs):
+    return request(api, "GET", url, **kwargs)
+
+
+def post(api, url, **kwargs):
+    return request(api, "POST", url, **kwargs)
@@ -0,0 +1,53 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from travel_dashboard import metrics
+from travel_dashboard.api import http_client, rate_limit
+from travel_dashboard.api.credentials import get_secret
+from travel_dashboard.api.response_cache import get_response_cache
+
+# OpenWeather 5 day / 3 hour forecasts.
+
+FORECAST_URL = "http://api.openweathermap.org/data/2.5/forecast"
+MAX_WEATHER_WORKERS = 8
+
+
+# Fetch weather data from OpenWeather API (safe to call from worker threads), for the
+# city or for near=(lat, lng) when given, since names such as Paris are ambiguous.
+# Returns None when the forecast could not be retrieved, and raises
+# rate_limit.RateLimited/QuotaExhausted when the rate limiter refused the request.
+# Cached forecasts older than max_age seconds, when given, are fetched again.
+@metrics.timed("api")
+def fetch_weather_data(city, max_age=None, near=None):
+    place = {'q': city} if near is None else {'lat': f"{near[0]:.4f}", 'lon': f"{near[1]:.4f}"}
+    params = {**place, 'appid': get_secret("openweather_key"), 'units': 'metric'}
+
+    def load():
+        response = http_client.get("openweather", FORECAST_URL, params=params)
+        return response.json() if response.status_code == 200 else None
+
+    try:
+        return get_response_cache().fetch("openweather", FORECAST_URL, params, load, max_age)
+    except rate_limit.RateLimitError:
+        raise
+    except (requests.exceptions.RequestException, ValueError):
+        return None
+
+
+# Function to fetch the forecasts of several City records concurrently, each around its
+# coordinates. Forecasts are cached per place, so adding a city to a comparison costs
+# one new request. A forecast the rate limiter refused is returned as its
+# rate_limit.RateLimitError instead.
+def fetch_weather_many(cities):
+    if not cities:
+        return {}
+
+    def fetch(city):
+        try:
+            return fetch_weather_data(city.name, near=(city.lat, city.lng))
+        except rate_limit.RateLimitError as error:
+            return error
+
+    with ThreadPoolExecutor(max_workers=min(MAX_WEATHER_WORKERS, len(cities))) as executor:
+        return dict(zip(cities, executor.map(metrics.propagate(fetch), cities)))
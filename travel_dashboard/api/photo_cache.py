@@ -0,0 +1,141 @@
+import hashlib
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from PIL import Image
+
+from travel_dashboard import CACHE_DIR, metrics
+from travel_dashboard.api import http_client
+
+# Server-side proxy for Google Place photos. Each photo_reference is fetched from the
+# Places Photo API once, shrunk to a thumbnail and stored in a content-addressed disk
+# cache, so browsers receive small local bytes and never see the API key. The blob
+# directory is kept under a byte budget by evicting the least recently used files.
+
+PHOTO_URL = "https://maps.googleapis.com/maps/api/place/photo"
+FETCH_WIDTH = 400
+THUMBNAIL_SIZE = (320, 240)
+THUMBNAIL_QUALITY = 80
+MAX_BYTES = int(os.environ.get("TRAVEL_DASHBOARD_PHOTO_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+MAX_PHOTO_WORKERS = 6
+
+
+class PhotoCache:
+    def __init__(self, directory, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._blob_dir = os.path.join(directory, "blobs")
+        self._ref_dir = os.path.join(directory, "refs")
+        os.makedirs(self._blob_dir, exist_ok=True)
+        os.makedirs(self._ref_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._total_bytes = None  # computed on the first write
+
+    # photo_references are long opaque strings, so they are stored under their hash
+    def _ref_path(self, photo_reference):
+        return os.path.join(self._ref_dir, hashlib.sha256(photo_reference.encode()).hexdigest())
+
+    def _blob_path(self, digest):
+        return os.path.join(self._blob_dir, f"{digest}.jpg")
+
+    def get(self, photo_reference):
+        try:
+            with open(self._ref_path(photo_reference)) as ref_file:
+                blob_path = self._blob_path(ref_file.read().strip())
+            with open(blob_path, "rb") as blob_file:
+                data = blob_file.read()
+            os.utime(blob_path)  # mark as recently used
+            return data
+        except OSError:
+            return None
+
+    def put(self, photo_reference, data):
+        digest = hashlib.sha256(data).hexdigest()
+        blob_path = self._blob_path(digest)
+        with self._lock:
+            if not os.path.exists(blob_path):
+                _write_atomic(blob_path, data)
+                if self._total_bytes is not None:
+                    self._total_bytes += len(data)
+            _write_atomic(self._ref_path(photo_reference), digest.encode())
+            self._evict()
+
+    # Remove the least recently used blobs once the byte budget is exceeded. Refs whose
+    # blob is gone are simply misses on the next lookup.
+    def _evict(self):
+        if self._total_bytes is not None and self._total_bytes <= self.max_bytes:
+            return
+        blobs = []
+        for entry in os.scandir(self._blob_dir):
+            if entry.is_file():
+                stat = entry.stat()
+                blobs.append((stat.st_mtime, stat.st_size, entry.path))
+        self._total_bytes = sum(size for _, size, _ in blobs)
+        for _, size, path in sorted(blobs):
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                self._total_bytes -= size
+            except OSError:
+                pass
+
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as tmp_file:
+        tmp_file.write(data)
+    os.replace(tmp_path, path)
+
+
+# Function to download one place photo and shrink it to a JPEG thumbnail
+@metrics.timed("api")
+def fetch_thumbnail(api_key, photo_reference):
+    params = {"maxwidth": FETCH_WIDTH, "photoreference": photo_reference, "key": api_key}
+    response = http_client.get("google_places", PHOTO_URL, params=params)
+    response.raise_for_status()
+    image = Image.open(io.BytesIO(response.content))
+    image.thumbnail(THUMBNAIL_SIZE)
+    output = io.BytesIO()
+    image.convert("RGB").save(output, format="JPEG", quality=THUMBNAIL_QUALITY, optimize=True)
+    return output.getvalue()
+
+
+_photo_cache = None
+_photo_cache_lock = threading.Lock()
+
+
+# Function to get the process-wide photo cache
+def get_photo_cache():
+    global _photo_cache
+    with _photo_cache_lock:
+        if _photo_cache is None:
+            _photo_cache = PhotoCache(os.path.join(CACHE_DIR, "photos"))
+        return _photo_cache
+
+
+# Function to get thumbnails for several photo references, fetching the missing ones in
+# parallel. take, when given, is called before every photo request and skips the photo
+# when it returns False (e.g. a request budget). Returns {photo_reference: jpeg bytes or
+# None if it could not be loaded}.
+def load_thumbnails(api_key, photo_references, take=None):
+    cache = get_photo_cache()
+    thumbnails = {reference: cache.get(reference) for reference in set(photo_references)}
+    missing = [reference for reference, data in thumbnails.items() if data is None]
+    if take is not None:
+        missing = [reference for reference in missing if take()]
+
+    def load(reference):
+        try:
+            data = fetch_thumbnail(api_key, reference)
+        except (requests.exceptions.RequestException, OSError, ValueError):
+            return reference, None
+        cache.put(reference, data)
+        return reference, data
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(MAX_PHOTO_WORKERS, len(missing))) as executor:
+            thumbnails.update(executor.map(metrics.propagate(load), missing))
+    return thumbnails
@@ -0,0 +1,160 @@
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+from travel_dashboard import metrics
+from travel_dashboard.api import http_client
+from travel_dashboard.api.response_cache import get_response_cache, make_key
+
+# Google Places Nearby Search for lodging.
+
+NEARBY_SEARCH_URL = 'https://maps.googleapis.com/maps/api/place/nearbysearch/json'
+
+
+# Function to get hotel data from Google Places API. Raises requests exceptions when the
+# search fails or Places does not accept it.
+@metrics.timed("api")
+def fetch_hotels(api_key, location, radius=5000):
+    params = {
+        'location': location,
+        'radius': radius,
+        'type': 'lodging',
+        'key': api_key
+    }
+
+    def load():
+        response = http_client.get("google_places", NEARBY_SEARCH_URL, params=params)
+        if response.status_code != 200:
+            raise requests.HTTPError(f"status {response.status_code}", response=response)
+        data = response.json()
+        # Quota and key errors also come back as 200 and must not be cached
+        return data if data.get('status') in ('OK', 'ZERO_RESULTS') else None
+
+    data = get_response_cache().fetch("google_places", NEARBY_SEARCH_URL, params, load)
+    if data is None:
+        raise requests.exceptions.RequestException("request was not accepted")
+    return data.get('results', [])
+
+
+# Coverage search: the area around the city is tiled into smaller Nearby Search circles
+# and each tile is followed through all of its result pages (Places returns at most 20
+# results per page and 60 per search). Results are de-duplicated by place_id.
+HOTEL_TILE_RADIUS = 1500  # meters
+MAX_HOTEL_REQUESTS = 60
+MAX_HOTEL_WORKERS = 4
+NEXT_PAGE_TOKEN_DELAY = 2.0  # seconds before a next_page_token becomes valid
+NEXT_PAGE_TOKEN_ATTEMPTS = 3
+
+
+# Caps the number of Places requests one coverage search may send, including the
+# photo requests of its results
+class RequestBudget:
+    def __init__(self, max_requests):
+        self.max_requests = max_requests
+        self.used = 0
+        self.exhausted = False  # set once a search request had to be skipped
+        self.photos_skipped = 0
+        self._lock = threading.Lock()
+
+    def take(self):
+        with self._lock:
+            if self.used >= self.max_requests:
+                self.exhausted = True
+                return False
+            self.used += 1
+            return True
+
+    # Photos of the results are charged to the same cap; a refused photo is only counted
+    # and does not mark the search itself as cut short
+    def take_photo(self):
+        with self._lock:
+            if self.used >= self.max_requests:
+                self.photos_skipped += 1
+                return False
+            self.used += 1
+            return True
+
+
+# Function to cover a circle of the given radius (meters) with a grid of tile centers,
+# nearest to the city center first
+def hotel_search_tiles(lat, lng, radius, tile_radius=HOTEL_TILE_RADIUS):
+    spacing = tile_radius * math.sqrt(2)  # the squares inscribed in the tiles leave no gaps
+    steps = math.ceil(radius / spacing)
+    meters_per_degree = 111320
+    offsets = [(i * spacing, j * spacing) for i in range(-steps, steps + 1) for j in range(-steps, steps + 1)]
+    offsets = [offset for offset in offsets if math.hypot(*offset) - tile_radius < radius]
+    offsets.sort(key=lambda offset: math.hypot(*offset))
+    return [(lat + north / meters_per_degree,
+             lng + east / (meters_per_degree * max(math.cos(math.radians(lat)), 0.01)))
+            for north, east in offsets]
+
+
+# Function to fetch every result page of one tile (safe to call from worker threads)
+@metrics.timed("api")
+def fetch_hotel_tile(api_key, center, tile_radius, budget):
+    params = {
+        'location': f"{center[0]:.5f},{center[1]:.5f}",
+        'radius': tile_radius,
+        'type': 'lodging',
+        'key': api_key
+    }
+    cache = get_response_cache()
+    key = make_key("google_places", NEARBY_SEARCH_URL, {**params, 'pages': 'all'})
+    cached, state = cache.get("google_places", key)
+    metrics.record_cache("google_places", {"fresh": "hit", "stale": "stale"}.get(state, "miss"))
+    if state is not None:
+        return cached['results']
+
+    results = []
+    page_params = params
+    while page_params is not None:
+        for attempt in range(NEXT_PAGE_TOKEN_ATTEMPTS):
+            if not budget.take():
+                return results  # partial tile, not cached
+            response = http_client.get("google_places", NEARBY_SEARCH_URL, params=page_params)
+            if response.status_code != 200:
+                raise requests.HTTPError(f"status {response.status_code}", response=response)
+            data = response.json()
+            # A token used too early is answered with INVALID_REQUEST; wait and try again
+            if data.get('status') != 'INVALID_REQUEST' or 'pagetoken' not in page_params:
+                break
+            time.sleep(NEXT_PAGE_TOKEN_DELAY)
+        if data.get('status') not in ('OK', 'ZERO_RESULTS'):
+            raise requests.exceptions.RequestException(f"Places status {data.get('status')}")
+        results.extend(data.get('results', []))
+
+        next_page_token = data.get('next_page_token')
+        if next_page_token:
+            time.sleep(NEXT_PAGE_TOKEN_DELAY)
+            page_params = {'pagetoken': next_page_token, 'key': api_key}
+        else:
+            page_params = None
+
+    cache.put("google_places", key, {'status': 'OK', 'results': results})
+    return results
+
+
+# Yields (new_hotels, failed) for every tile as soon as it completes, with bounded concurrency
+def iter_hotels_coverage(api_key, tiles, budget, tile_radius=HOTEL_TILE_RADIUS):
+    seen = set()
+    executor = ThreadPoolExecutor(max_workers=MAX_HOTEL_WORKERS)
+    try:
+        futures = [executor.submit(metrics.propagate(fetch_hotel_tile), api_key, tile, tile_radius, budget)
+                   for tile in tiles]
+        for future in as_completed(futures):
+            try:
+                results = future.result()
+            except (requests.exceptions.RequestException, ValueError):
+                yield [], True
+                continue
+            new_hotels = []
+            for hotel in results:
+                if hotel.get('place_id') not in seen:
+                    seen.add(hotel.get('place_id'))
+                    new_hotels.append(hotel)
+            yield new_hotels, False
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
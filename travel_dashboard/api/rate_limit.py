@@ -0,0 +1,209 @@
+import contextlib
+import contextvars
+import math
+import threading
+import time
+from collections import Counter, deque, namedtuple
+
+import requests
+
+from travel_dashboard import metrics
+
+# Process-wide rate limiting of upstream requests. Every API has a token bucket refilled
+# at its documented request rate, and APIs with a daily quota also count today's requests
+# in the usage store, shared by every process using the cache directory. Each attempt of
+# http_client.request takes a token first:
+#   - when one is available the request goes out at once,
+#   - otherwise it is queued (first come, first served within its priority) until the
+#     bucket refills, as long as the estimated wait stays within MAX_WAIT; longer waits
+#     raise RateLimited with the estimate, and
+#   - once the daily quota is used up, QuotaExhausted is raised without waiting.
+# Interactive requests come first: background work (the cache warmer, stale refreshes)
+# only takes a token while no interactive request is queued and more than
+# BACKGROUND_RESERVE of the bucket is left, so a burst from a session never waits behind
+# prefetching.
+
+RateLimit = namedtuple("RateLimit", ["rate", "burst", "daily_quota"])
+
+RATE_LIMITS = {
+    "ticketmaster": RateLimit(rate=5, burst=5, daily_quota=5000),  # Discovery API: 5 requests/second, 5000/day
+    "amadeus": RateLimit(rate=10, burst=1, daily_quota=None),  # test environment: one request every 100 ms
+    "google_places": RateLimit(rate=10, burst=20, daily_quota=None),
+    "openweather": RateLimit(rate=1, burst=60, daily_quota=None),  # free plan: 60 calls/minute
+}
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+PRIORITIES = (INTERACTIVE, BACKGROUND)
+MAX_WAIT = {INTERACTIVE: 10.0, BACKGROUND: 30.0}  # seconds a request may stay queued
+BACKGROUND_RESERVE = 0.4  # share of each bucket kept for interactive requests
+
+_priority = contextvars.ContextVar("travel_dashboard_request_priority", default=INTERACTIVE)
+
+
+class RateLimitError(requests.exceptions.RequestException):
+    pass
+
+
+# Raised when a request would have to wait longer than MAX_WAIT for a token
+class RateLimited(RateLimitError):
+    def __init__(self, api, estimated_wait):
+        super().__init__(f"{api} is busy, estimated wait {math.ceil(estimated_wait)} s")
+        self.api = api
+        self.estimated_wait = estimated_wait
+
+
+class QuotaExhausted(RateLimitError):
+    def __init__(self, api, daily_quota):
+        super().__init__(f"the daily {api} quota of {daily_quota} requests is used up")
+        self.api = api
+        self.daily_quota = daily_quota
+
+
+# Context manager giving the requests sent inside it the given priority
+@contextlib.contextmanager
+def prioritized(priority):
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority():
+    return _priority.get()
+
+
+class TokenBucket:
+    def __init__(self, api, limit, quota_used=None):
+        self.api = api
+        self.limit = limit
+        self.quota_used = quota_used  # function returning today's requests, when the API has a quota
+        self.tokens = float(limit.burst)
+        self.rejections = Counter()  # (priority, reason) -> refused requests
+        self._queues = {priority: deque() for priority in PRIORITIES}  # waiting requests, first come first served
+        self._updated = time.monotonic()
+        self._condition = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(float(self.limit.burst), self.tokens + (now - self._updated) * self.limit.rate)
+        self._updated = now
+
+    def _reserve(self, priority):
+        return 0 if priority == INTERACTIVE else math.floor(self.limit.burst * BACKGROUND_RESERVE)
+
+    def _may_take(self, priority, ticket):
+        if self._queues[priority][0] is not ticket:
+            return False
+        if priority == BACKGROUND and self._queues[INTERACTIVE]:
+            return False
+        return self.tokens - 1 >= self._reserve(priority)
+
+    # Seconds until a queued request would get a token, counting the requests ahead of it
+    def _estimated_wait(self, priority, ticket):
+        ahead = self._queues[priority].index(ticket)
+        if priority == BACKGROUND:
+            ahead += len(self._queues[INTERACTIVE])
+        needed = 1 + self._reserve(priority) + ahead - self.tokens
+        return max(needed, 0.0) / self.limit.rate
+
+    def _quota_left(self):
+        if self.limit.daily_quota is None or self.quota_used is None:
+            return True
+        return self.quota_used(self.api) < self.limit.daily_quota
+
+    def _reject(self, priority, reason):
+        self.rejections[(priority, reason)] += 1
+        metrics.registry.inc("rate_limit_rejections_total", {"api": self.api, "priority": priority, "reason": reason})
+
+    # Function to take one token, waiting for it up to max_wait seconds. Returns the
+    # seconds spent queued.
+    def acquire(self, priority=INTERACTIVE, max_wait=None):
+        max_wait = MAX_WAIT[priority] if max_wait is None else max_wait
+        started = time.monotonic()
+        with self._condition:
+            if not self._quota_left():
+                self._reject(priority, "quota")
+                raise QuotaExhausted(self.api, self.limit.daily_quota)
+            ticket = object()
+            self._queues[priority].append(ticket)
+            try:
+                while True:
+                    self._refill()
+                    if self._may_take(priority, ticket):
+                        self.tokens -= 1
+                        return time.monotonic() - started
+                    wait = self._estimated_wait(priority, ticket)
+                    if time.monotonic() - started + wait > max_wait:
+                        self._reject(priority, "wait")
+                        raise RateLimited(self.api, wait)
+                    # Background requests have no estimate while interactive ones are queued
+                    self._condition.wait(max(wait, 1 / self.limit.rate))
+            finally:
+                self._queues[priority].remove(ticket)
+                self._condition.notify_all()
+
+    def state(self):
+        with self._condition:
+            self._refill()
+            return {
+                "api": self.api,
+                "tokens": round(self.tokens, 2),
+                "burst": self.limit.burst,
+                "rate": self.limit.rate,
+                "quota_used": self.quota_used(self.api) if self.limit.daily_quota and self.quota_used else None,
+                "daily_quota": self.limit.daily_quota,
+                "waiting": {priority: len(self._queues[priority]) for priority in PRIORITIES},
+                "rejections": dict(self.rejections),
+            }
+
+
+class RateLimiter:
+    def __init__(self, limits=RATE_LIMITS, quota_used=None):
+        self.buckets = {api: TokenBucket(api, limit, quota_used) for api, limit in limits.items()}
+
+    # Function to wait for a token of an API at the priority of the calling context
+    def acquire(self, api, priority=None):
+        bucket = self.buckets.get(api)
+        if bucket is None:
+            return 0.0
+        priority = priority or current_priority()
+        started = time.perf_counter()
+        waited = bucket.acquire(priority)
+        if waited > 0.001:
+            metrics.record_queue(api, priority, started, waited)
+        return waited
+
+    def states(self):
+        return [bucket.state() for bucket in self.buckets.values()]
+
+    # Gauges for the metrics exporters
+    def collect(self):
+        gauges = []
+        for state in self.states():
+            labels = {"api": state["api"]}
+            gauges.append(("rate_limit_tokens", labels, state["tokens"]))
+            if state["quota_used"] is not None:
+                gauges.append(("rate_limit_quota_used", labels, state["quota_used"]))
+            for priority, waiting in state["waiting"].items():
+                gauges.append(("rate_limit_waiting", {**labels, "priority": priority}, waiting))
+        return gauges
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+# Function to get the process-wide rate limiter
+def get_rate_limiter():
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            # Imported here: the usage store lives in the response cache database, and the
+            # response cache itself marks its stale refreshes with prioritized()
+            from travel_dashboard.api.usage import get_usage_store
+
+            _limiter = RateLimiter(quota_used=get_usage_store().requests_today)
+            metrics.registry.add_collector(_limiter.collect)
+        return _limiter
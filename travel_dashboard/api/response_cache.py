@@ -0,0 +1,291 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from travel_dashboard import CACHE_DIR, metrics
+from travel_dashboard.api import rate_limit
+
+# Persistent TTL cache for upstream API responses, shared by every session and every
+# process pointing at the same cache directory. Entries are fresh for `ttl` seconds,
+# then served stale for up to `stale_ttl` more seconds while a background refresh
+# replaces them. Entries past their stale window are swept out every few minutes, and
+# the total size is kept under a byte budget by evicting the least recently used
+# entries. Concurrent misses on the same key are coalesced: the first
+# caller loads the response and every other caller waits for its result (single-flight),
+# except that interactive callers never wait for a background load.
+
+CachePolicy = namedtuple("CachePolicy", ["ttl", "stale_ttl"])
+
+CACHE_POLICIES = {
+    "openweather": CachePolicy(ttl=3 * 3600, stale_ttl=3600),  # forecasts move in 3 hour steps
+    "google_places": CachePolicy(ttl=24 * 3600, stale_ttl=6 * 3600),
+    # Served stale for a day so listings warmed off-peak by the cache warmer last until the
+    # next warm-up; the first reader after an hour still triggers a background refresh
+    "ticketmaster": CachePolicy(ttl=3600, stale_ttl=24 * 3600),
+    "ticketmaster_day": CachePolicy(ttl=3600, stale_ttl=24 * 3600),  # events per city, category and day
+    "amadeus": CachePolicy(ttl=5 * 60, stale_ttl=0),  # offers go stale within minutes
+    "amadeus_calendar": CachePolicy(ttl=30 * 60, stale_ttl=0),  # cheapest fare per date pair
+}
+
+# Request parameters holding credentials. Every deployment uses a single key per API,
+# so responses do not depend on the key and it is left out of the cache key. Set
+# INCLUDE_API_KEYS_IN_KEY when keys differ per user so cached responses never cross
+# accounts; the key is then hashed into the cache key, never stored in clear text.
+SECRET_PARAMS = {"apikey", "appid", "key", "client_id", "client_secret"}
+INCLUDE_API_KEYS_IN_KEY = False
+
+MAX_BYTES = int(os.environ.get("TRAVEL_DASHBOARD_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+EVICT_TO = 0.9  # share of the budget an eviction frees the cache down to
+PURGE_INTERVAL = 10 * 60  # seconds between sweeps of entries past their stale window
+CACHE_DB = os.path.join(CACHE_DIR, "responses.sqlite3")
+
+
+# Function to build the cache key of a request from its normalized parameters
+def make_key(api, url, params=None):
+    normalized = {}
+    for name, value in (params or {}).items():
+        if value is None:
+            continue
+        if name in SECRET_PARAMS:
+            if not INCLUDE_API_KEYS_IN_KEY:
+                continue
+            value = hashlib.sha256(str(value).encode()).hexdigest()
+        elif isinstance(value, str):
+            value = value.strip()
+        normalized[name] = str(value)
+    raw = json.dumps([api, url, normalized], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path, max_bytes=MAX_BYTES, policies=CACHE_POLICIES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.policies = policies
+        self._local = threading.local()
+        self._refreshing = set()
+        self._refreshing_lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cache-refresh")
+        self._flights = {}  # (key, priority) -> _Flight of the load in progress
+        self._flights_lock = threading.Lock()
+        self._size_lock = threading.Lock()
+        self._total_bytes = None  # estimate of the table size, computed on the first write
+        self._next_purge = 0.0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._connection().executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                api TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+        """)
+
+    # SQLite connections cannot be shared between threads, so each thread opens its own
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    # Returns (value, state) where state is "fresh", "stale" or None for a miss. Entries
+    # older than max_age seconds, when given, count as misses.
+    def get(self, api, key, max_age=None):
+        policy = self.policies[api]
+        row = self._connection().execute(
+            "SELECT body, stored_at FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None, None
+        age = time.time() - row[1]
+        if age > policy.ttl + policy.stale_ttl or (max_age is not None and age > max_age):
+            return None, None
+        self._connection().execute(
+            "UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        value = json.loads(zlib.decompress(row[0]))
+        return value, "fresh" if age <= policy.ttl else "stale"
+
+    def put(self, api, key, value):
+        body = zlib.compress(json.dumps(value, separators=(",", ":")).encode())
+        now = time.time()
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO responses (key, api, body, size, stored_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)", (key, api, body, len(body), now, now))
+        with self._size_lock:
+            if self._total_bytes is not None:
+                self._total_bytes += len(body)
+            if now >= self._next_purge:
+                self._purge_expired(connection, now)
+            self._evict(connection)
+
+    # Function to drop every entry, or only those of one API
+    def clear(self, api=None):
+        if api is None:
+            self._connection().execute("DELETE FROM responses")
+        else:
+            self._connection().execute("DELETE FROM responses WHERE api = ?", (api,))
+        with self._size_lock:
+            self._total_bytes = None
+
+    # Drop the entries past their stale window, which are never served again. The size
+    # estimate is recounted afterwards, which also picks up other processes' writes.
+    def _purge_expired(self, connection, now):
+        for api, policy in self.policies.items():
+            connection.execute("DELETE FROM responses WHERE api = ? AND stored_at < ?",
+                               (api, now - policy.ttl - policy.stale_ttl))
+        self._total_bytes = None
+        self._next_purge = now + PURGE_INTERVAL
+
+    # Drop the least recently used entries once the byte budget is exceeded, down to
+    # EVICT_TO of it so the next writes do not evict again. The size is tracked as a
+    # running estimate (replaced entries and other processes' writes are only picked up
+    # by the recount), so the table is only scanned when the estimate is over budget.
+    def _evict(self, connection):
+        if self._total_bytes is not None and self._total_bytes <= self.max_bytes:
+            return
+        self._total_bytes = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if self._total_bytes <= self.max_bytes:
+            return
+        connection.execute("""
+            DELETE FROM responses WHERE key IN (
+                SELECT key FROM (
+                    SELECT key, SUM(size) OVER (ORDER BY accessed_at DESC, key) AS running_size
+                    FROM responses
+                ) WHERE running_size > ?
+            )""", (int(self.max_bytes * EVICT_TO),))
+        self._total_bytes = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    # Function to serve a request from the cache, calling load() on a miss. load returns
+    # the JSON response, or None for a result that must not be cached; its exceptions
+    # propagate to the caller on a miss and are ignored during background refreshes.
+    # max_age forces a reload of entries stored longer ago than that many seconds.
+    def fetch(self, api, url, params, load, max_age=None):
+        if api not in self.policies:
+            return load()
+        key = make_key(api, url, params)
+        value, state = self.get(api, key, max_age)
+        if state is None:
+            return self._load_once(api, key, load, max_age)
+        metrics.record_cache(api, "hit" if state == "fresh" else "stale")
+        if state == "stale":
+            self._refresh_in_background(api, key, load)
+        return value
+
+    # Function to load a missing entry once per key across all threads: the first caller
+    # runs load() and stores its result, later callers wait for it and share the result
+    # or the exception. Flights are kept per priority, so an interactive caller never
+    # waits behind a background load paced by the rate limiter; background callers also
+    # join an interactive flight. Errors that only concern the leader's own request (its
+    # rate limit priority or background budget refused it) are not shared: followers
+    # retry under their own priority instead.
+    def _load_once(self, api, key, load, max_age):
+        priority = rate_limit.current_priority()
+        while True:
+            with self._flights_lock:
+                flight = self._flights.get((key, priority))
+                if flight is None and priority == rate_limit.BACKGROUND:
+                    flight = self._flights.get((key, rate_limit.INTERACTIVE))
+                leader = flight is None
+                if leader:
+                    flight = self._flights[(key, priority)] = _Flight()
+            metrics.record_cache(api, "miss" if leader else "coalesced")
+            if leader:
+                break
+            try:
+                return flight.wait()
+            except requests.exceptions.RequestException as error:
+                if not _refused_for_caller(error):
+                    raise
+
+        try:
+            # Another flight may have stored the entry since this caller's lookup
+            value, state = self.get(api, key, max_age)
+            if state is None:
+                value = load()
+                if value is not None:
+                    self.put(api, key, value)
+            flight.resolve(value)
+            return value
+        except BaseException as error:
+            flight.fail(error)
+            raise
+        finally:
+            with self._flights_lock:
+                del self._flights[(key, priority)]
+
+    def _refresh_in_background(self, api, key, load):
+        with self._refreshing_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        # Refreshes are prefetching: they yield to interactive requests in the rate limiter
+        def run():
+            try:
+                with rate_limit.prioritized(rate_limit.BACKGROUND):
+                    value = load()
+                if value is not None:
+                    self.put(api, key, value)
+            except Exception:
+                pass  # the stale entry keeps being served until it expires
+            finally:
+                with self._refreshing_lock:
+                    self._refreshing.discard(key)
+
+        self._refresher.submit(run)
+
+
+# Whether an error refused the request of the caller that made it rather than failing
+# the request itself
+def _refused_for_caller(error):
+    # http_client imports the usage store, which imports this module
+    from travel_dashboard.api.http_client import BudgetExhausted
+    return isinstance(error, (rate_limit.RateLimitError, BudgetExhausted))
+
+
+class _Flight:
+    def __init__(self):
+        self._done = threading.Event()
+        self._value = None
+        self._error = None
+
+    def resolve(self, value):
+        self._value = value
+        self._done.set()
+
+    def fail(self, error):
+        self._error = error
+        self._done.set()
+
+    def wait(self):
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+# Function to get the process-wide response cache
+def get_response_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(CACHE_DB)
+        return _cache
@@ -0,0 +1,293 @@
+import math
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta
+
+import requests
+
+from travel_dashboard import metrics
+from travel_dashboard.api import http_client, rate_limit
+from travel_dashboard.api.credentials import get_secret
+from travel_dashboard.api.response_cache import get_response_cache, make_key
+
+# Ticketmaster Discovery API event searches.
+
+EVENTS_URL = "https://app.ticketmaster.com/discovery/v2/events.json"
+
+# Ticketmaster only serves the first 1000 results of a query (size * page < 1000)
+EVENTS_PAGE_SIZE = 100
+MAX_EVENT_PAGES = 1000 // EVENTS_PAGE_SIZE
+MAX_EVENT_WORKERS = 8
+
+# Classifications offered on the Events page
+CATEGORIES = ["Music", "Sports", "Arts & Theatre", "Comedy", "Festivals"]
+
+# Radius of searches around coordinates (near=(lat, lng)) instead of by city name, which
+# is ambiguous for names such as Paris or Portland
+NEAR_RADIUS_KM = 25
+
+
+# Function to build the parameters selecting where to search: the city name, or the
+# area around near=(lat, lng) when given
+def place_params(city, near=None):
+    if near is None:
+        return {'city': city}
+    return {'latlong': f"{near[0]:.4f},{near[1]:.4f}", 'radius': NEAR_RADIUS_KM, 'unit': 'km'}
+
+
+# Fetch a single page of Ticketmaster events for one category, in the city or around
+# near=(lat, lng) when given. Cached pages older than max_age seconds, when given, are
+# fetched again.
+@metrics.timed("api")
+def fetch_events_page(city, start_date, end_date, category, page_number=0, max_age=None, near=None):
+    params = {
+        'apikey': get_secret("ticketmaster_key"),
+        **place_params(city, near),
+        'startDateTime': start_date.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'endDateTime': end_date.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'size': EVENTS_PAGE_SIZE,
+        'classificationName': category,
+        'page': page_number,
+    }
+
+    def load():
+        response = http_client.get("ticketmaster", EVENTS_URL, params=params)
+        if response.status_code != 200:
+            raise requests.HTTPError(f"{category} page {page_number}: status {response.status_code}",
+                                     response=response)
+        return response.json()
+
+    data = get_response_cache().fetch("ticketmaster", EVENTS_URL, params, load, max_age)
+    return data.get('_embedded', {}).get('events', []), data.get('page', {})
+
+
+# Event searches are cached per (city, category, day) bucket on top of the page cache:
+# a search is split into the days it covers, buckets already cached are served at once,
+# and only the missing days are fetched, as one query per category and contiguous run
+# of days. Widening the date window or adding a category therefore only fetches what is
+# new. A day runs from 00:00 to 24:00 UTC, matching the startDateTime/endDateTime
+# filter. Buckets keep only the event fields the app reads (compact_event) and are
+# written once every page of their query arrived, so a truncated or partly failed
+# query never caches an incomplete day. Stale buckets are served while their days are
+# fetched again in the background.
+DAY_BUCKET_API = "ticketmaster_day"
+MAX_REFRESH_WORKERS = 2
+
+_refresher = ThreadPoolExecutor(max_workers=MAX_REFRESH_WORKERS, thread_name_prefix="events-refresh")
+_refreshing = set()  # queries being refreshed in the background
+_refreshing_lock = threading.Lock()
+
+
+def _copy_fields(source, fields):
+    return {field: source[field] for field in fields if field in source}
+
+
+# Function to keep only the fields of an event that the app reads, in the API's shape
+def compact_event(event):
+    compact = _copy_fields(event, ['id', 'name', 'url'])
+    compact['dates'] = {'start': _copy_fields(event.get('dates', {}).get('start', {}),
+                                              ['localDate', 'localTime', 'dateTime'])}
+    if event.get('images'):
+        compact['images'] = [_copy_fields(event['images'][0], ['url'])]
+    venues = event.get('_embedded', {}).get('venues')
+    if venues:
+        venue = _copy_fields(venues[0], ['name'])
+        if 'address' in venues[0]:
+            venue['address'] = _copy_fields(venues[0]['address'], ['line1'])
+        if 'location' in venues[0]:
+            venue['location'] = _copy_fields(venues[0]['location'], ['latitude', 'longitude'])
+        compact['_embedded'] = {'venues': [venue]}
+    return compact
+
+
+# UTC day (YYYY-MM-DD) an event belongs to; events without a time use their local date
+def event_day(event):
+    start = event.get('dates', {}).get('start', {})
+    value = start.get('dateTime') or start.get('localDate')
+    return value[:10] if value else None
+
+
+def _as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+# Days covered by a search: from start_date up to, not including, end_date (at least one)
+def search_days(start_date, end_date):
+    start_day = _as_date(start_date)
+    return [start_day + timedelta(days=offset) for offset in range(max((_as_date(end_date) - start_day).days, 1))]
+
+
+def bucket_key(city, category, day, near=None):
+    return make_key(DAY_BUCKET_API, EVENTS_URL,
+                    {**place_params(city, near), 'category': category, 'day': day.isoformat()})
+
+
+# Function to split consecutive days into (start, end) ranges, end exclusive
+def day_ranges(days):
+    ranges = []
+    for day in sorted(days):
+        if ranges and ranges[-1][1] == day:
+            ranges[-1][1] = day + timedelta(days=1)
+        else:
+            ranges.append([day, day + timedelta(days=1)])
+    return [tuple(day_range) for day_range in ranges]
+
+
+# Function to look up the day buckets of a search. Returns the cached events, the
+# queries (category, start, end) for missing days and those for stale days.
+def _lookup_buckets(city, near, days, categories, max_age):
+    cache = get_response_cache()
+    cached_events, missing, stale = [], [], []
+    for category in categories:
+        missing_days, stale_days = [], []
+        for day in days:
+            events, state = cache.get(DAY_BUCKET_API, bucket_key(city, category, day, near), max_age)
+            metrics.record_cache(DAY_BUCKET_API, {"fresh": "hit", "stale": "stale", None: "miss"}[state])
+            if state is None:
+                missing_days.append(day)
+                continue
+            cached_events.extend(events)
+            if state == "stale":
+                stale_days.append(day)
+        missing.extend((category, start, end) for start, end in day_ranges(missing_days))
+        stale.extend((category, start, end) for start, end in day_ranges(stale_days))
+    return cached_events, missing, stale
+
+
+# Function to store the events of a complete query in its day buckets, including the
+# days without events. Events dated outside the query (a local date without a time can
+# be a day off the UTC window) go to its nearest day, so a repeated search from the
+# buckets returns what the query did.
+def _store_buckets(city, near, query, events):
+    category, start, end = query
+    days = [(start + timedelta(days=offset)).isoformat() for offset in range((end - start).days)]
+    by_day = {day: [] for day in days}
+    for event in events:
+        day = min(max(event_day(event) or days[0], days[0]), days[-1])
+        by_day[day].append(event)
+    cache = get_response_cache()
+    for day, day_events in by_day.items():
+        cache.put(DAY_BUCKET_API, bucket_key(city, category, date.fromisoformat(day), near), day_events)
+
+
+# Yields (events, failed_page) for every page of the queries (category, start, end) as
+# soon as it arrives, with the events compacted. Page 0 of every query is requested at
+# once; the remaining pages fan out as soon as totalPages is known. A failing page
+# yields no events and its label instead, which says how long to wait when the rate
+# limiter refused it. The day buckets of every complete query are stored.
+def _iter_query_pages(city, near, queries, max_age=None):
+    executor = ThreadPoolExecutor(max_workers=MAX_EVENT_WORKERS)
+    results = {query: {"events": [], "pages_left": 1, "complete": True} for query in queries}
+    try:
+        pending = {
+            executor.submit(metrics.propagate(fetch_events_page), city, start, end, category,
+                            max_age=max_age, near=near): ((category, start, end), 0)
+            for category, start, end in queries
+        }
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                query, page_number = pending.pop(future)
+                category, start, end = query
+                result = results[query]
+                result["pages_left"] -= 1
+                try:
+                    page_events, page = future.result()
+                except (requests.exceptions.RequestException, ValueError) as error:
+                    result["complete"] = False
+                    yield [], _failed_page_label(category, page_number, error)
+                    continue
+
+                if page_number == 0:
+                    total_pages = page.get('totalPages', 1)
+                    if total_pages > MAX_EVENT_PAGES:
+                        # Only the first 1000 results are served; the days stay uncached
+                        result["complete"] = False
+                        total_pages = MAX_EVENT_PAGES
+                    for next_page in range(1, total_pages):
+                        future = executor.submit(metrics.propagate(fetch_events_page), city, start, end,
+                                                 category, next_page, max_age, near)
+                        pending[future] = (query, next_page)
+                    result["pages_left"] += max(total_pages - 1, 0)
+                page_events = [compact_event(event) for event in page_events]
+                result["events"].extend(page_events)
+                if result["pages_left"] == 0 and result["complete"]:
+                    _store_buckets(city, near, query, result["events"])
+                yield page_events, None
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _failed_page_label(category, page_number, error):
+    if isinstance(error, rate_limit.RateLimited):
+        return f"{category} (page {page_number + 1}, retry in {math.ceil(error.estimated_wait)} s)"
+    if isinstance(error, rate_limit.QuotaExhausted):
+        return f"{category} (page {page_number + 1}, daily quota used up)"
+    return f"{category} (page {page_number + 1})"
+
+
+# Function to fetch the days of stale buckets again in the background, at background
+# priority in the rate limiter. Their pages are reloaded rather than served from the
+# page cache, which holds responses as old as the buckets.
+def _refresh_in_background(city, near, queries):
+    with _refreshing_lock:
+        queries = [query for query in queries if (city, near, query) not in _refreshing]
+        _refreshing.update((city, near, query) for query in queries)
+    if not queries:
+        return
+
+    def run():
+        try:
+            with rate_limit.prioritized(rate_limit.BACKGROUND):
+                for _ in _iter_query_pages(city, near, queries, max_age=0):
+                    pass
+        finally:
+            with _refreshing_lock:
+                _refreshing.difference_update((city, near, query) for query in queries)
+
+    _refresher.submit(run)
+
+
+# Yields (events, failed_page) for a search: first every cached day bucket at once, then
+# every page fetched for the missing days as soon as it arrives. Events are compacted
+# (compact_event). Buckets older than max_age seconds, when given, count as missing. The
+# search covers the city, or the area around near=(lat, lng) when given.
+def iter_event_pages(city, start_date, end_date, categories, max_age=None, near=None):
+    cached_events, missing, stale = _lookup_buckets(city, near, search_days(start_date, end_date), categories,
+                                                    max_age)
+    if stale:
+        _refresh_in_background(city, near, stale)
+    if cached_events:
+        yield cached_events, None
+    yield from _iter_query_pages(city, near, missing, max_age)
+
+
+# Key an event is merged under: its id, or its name, start and venue when it has none
+def event_key(event):
+    if event.get('id'):
+        return event['id']
+    start = event.get('dates', {}).get('start', {})
+    venue = event.get('_embedded', {}).get('venues', [{}])[0]
+    return event.get('name'), start.get('localDate'), start.get('localTime'), venue.get('name')
+
+
+# The same event is often listed under several classifications
+def merge_events(events_by_id, page_events):
+    for event in page_events:
+        events_by_id.setdefault(event_key(event), event)
+
+
+def sort_events(events):
+    return sorted(events, key=lambda x: x['dates']['start']['localDate'])
+
+
+# Fetch events from Ticketmaster API with pagination. Returns (events, failed_pages).
+@metrics.timed("api")
+def fetch_all_events(city, start_date, end_date, categories, max_age=None, near=None):
+    events_by_id = {}
+    failed_pages = []
+    for page_events, failed_page in iter_event_pages(city, start_date, end_date, categories, max_age, near):
+        if failed_page:
+            failed_pages.append(failed_page)
+        merge_events(events_by_id, page_events)
+    return sort_events(events_by_id.values()), failed_pages
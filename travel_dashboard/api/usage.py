@@ -0,0 +1,181 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+from travel_dashboard.api.response_cache import CACHE_DB
+
+# Interactive usage, shared by every process using the same cache directory: how often
+# each city is looked up (per day) and how many upstream requests interactive sessions
+# send (per API and minute). The cache warmer reads both, the first to pick the cities
+# worth keeping warm and the second to stay out of the way of interactive traffic. The
+# requests of all kinds are also counted per API and day for the daily quotas of the
+# rate limiter. Counts are kept in memory and written to the response cache database at
+# most every FLUSH_INTERVAL seconds. Today's quota counts are served from memory too: they
+# are read from the database on the first lookup of a day and after every flush, so the
+# rate limiter never queries the database per request.
+
+FLUSH_INTERVAL = 10  # seconds
+POPULARITY_DAYS = 7
+ACTIVITY_RETENTION = 3600  # seconds of per-minute request counts kept
+
+
+class UsageStore:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._cities = Counter()  # city -> lookups not yet written
+        self._requests = Counter()  # (api, minute) -> requests not yet written
+        self._daily = Counter()  # (api, day) -> requests of any kind not yet written
+        self._today = None  # day of the counts below
+        self._today_requests = Counter()  # api -> requests of that day in every process
+        self._flushed_at = time.monotonic()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._connection().executescript("""
+            CREATE TABLE IF NOT EXISTS city_requests (
+                city TEXT NOT NULL,
+                day TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (city, day)
+            );
+            CREATE TABLE IF NOT EXISTS api_activity (
+                api TEXT NOT NULL,
+                minute INTEGER NOT NULL,
+                requests INTEGER NOT NULL,
+                PRIMARY KEY (api, minute)
+            );
+            CREATE TABLE IF NOT EXISTS api_daily (
+                api TEXT NOT NULL,
+                day TEXT NOT NULL,
+                requests INTEGER NOT NULL,
+                PRIMARY KEY (api, day)
+            );
+        """)
+
+    # SQLite connections cannot be shared between threads, so each thread opens its own
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def record_city(self, city):
+        with self._lock:
+            self._cities[city] += 1
+        self._flush_if_due()
+
+    # Function to count one upstream request, sent for an interactive session or as
+    # background work
+    def record_request(self, api, interactive=True):
+        with self._lock:
+            if interactive:
+                self._requests[(api, int(time.time() // 60))] += 1
+            day = date.today().isoformat()
+            self._daily[(api, day)] += 1
+            if self._today == day:
+                self._today_requests[api] += 1
+        self._flush_if_due()
+
+    def _flush_if_due(self):
+        if time.monotonic() - self._flushed_at >= FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            cities, requests, daily = self._cities, self._requests, self._daily
+            self._cities, self._requests, self._daily = Counter(), Counter(), Counter()
+            self._flushed_at = time.monotonic()
+        if not cities and not requests and not daily:
+            return
+        today = date.today().isoformat()
+        connection = self._connection()
+        try:
+            connection.executemany(
+                "INSERT INTO city_requests (city, day, count) VALUES (?, ?, ?) "
+                "ON CONFLICT (city, day) DO UPDATE SET count = count + excluded.count",
+                [(city, today, count) for city, count in cities.items()])
+            connection.executemany(
+                "INSERT INTO api_activity (api, minute, requests) VALUES (?, ?, ?) "
+                "ON CONFLICT (api, minute) DO UPDATE SET requests = requests + excluded.requests",
+                [(api, minute, count) for (api, minute), count in requests.items()])
+            connection.executemany(
+                "INSERT INTO api_daily (api, day, requests) VALUES (?, ?, ?) "
+                "ON CONFLICT (api, day) DO UPDATE SET requests = requests + excluded.requests",
+                [(api, day, count) for (api, day), count in daily.items()])
+            connection.execute("DELETE FROM api_activity WHERE minute < ?",
+                               (int((time.time() - ACTIVITY_RETENTION) // 60),))
+            connection.execute("DELETE FROM city_requests WHERE day < ?",
+                               ((date.today() - timedelta(days=POPULARITY_DAYS)).isoformat(),))
+            connection.execute("DELETE FROM api_daily WHERE day < ?",
+                               ((date.today() - timedelta(days=POPULARITY_DAYS)).isoformat(),))
+        except sqlite3.OperationalError:
+            # The database is busy; keep the counts for the next flush
+            with self._lock:
+                self._cities.update(cities)
+                self._requests.update(requests)
+                self._daily.update(daily)
+            return
+        # Picks up the requests other processes sent since the last flush
+        try:
+            self._load_today(today)
+        except sqlite3.OperationalError:
+            pass  # the counts in memory stay in use until the next flush
+
+    # Function to read the day's requests per API of every process into memory, adding
+    # the ones of this process not written yet
+    def _load_today(self, today):
+        stored = Counter(dict(self._connection().execute(
+            "SELECT api, requests FROM api_daily WHERE day = ?", (today,)).fetchall()))
+        with self._lock:
+            self._today = today
+            self._today_requests = stored + Counter({api: count for (api, day), count in self._daily.items()
+                                                     if day == today})
+
+    # Function to get the most looked-up cities of the last `days` days as (city, lookups)
+    def top_cities(self, n, days=POPULARITY_DAYS):
+        self.flush()
+        since = (date.today() - timedelta(days=days - 1)).isoformat()
+        return self._connection().execute(
+            "SELECT city, SUM(count) AS lookups FROM city_requests WHERE day >= ? "
+            "GROUP BY city ORDER BY lookups DESC, city LIMIT ?", (since, n)).fetchall()
+
+    # Function to count the interactive upstream requests of the last `seconds` seconds
+    # (rounded out to whole minutes), for one API or all of them, across all processes
+    def recent_requests(self, seconds, api=None):
+        since = int((time.time() - seconds) // 60)
+        with self._lock:
+            pending = sum(count for (name, minute), count in self._requests.items()
+                          if minute >= since and api in (None, name))
+        stored = self._connection().execute(
+            "SELECT COALESCE(SUM(requests), 0) FROM api_activity WHERE minute >= ? AND (? IS NULL OR api = ?)",
+            (since, api, api)).fetchone()[0]
+        return stored + pending
+
+    # Function to count today's upstream requests to an API, of any kind, across all
+    # processes (as of the last flush for the other processes)
+    def requests_today(self, api):
+        today = date.today().isoformat()
+        with self._lock:
+            if self._today == today:
+                return self._today_requests[api]
+        self._load_today(today)
+        with self._lock:
+            return self._today_requests[api]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+# Function to get the process-wide usage store
+def get_usage_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = UsageStore(CACHE_DB)
+        return _store
@@ -0,0 +1,336 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, timedelta
+
+import pandas as pd
+import requests
+
+from travel_dashboard.api import openweather, places, rate_limit, ticketmaster
+from travel_dashboard.api.credentials import MissingSecret, get_secret
+from travel_dashboard.data.city_index import City, read_cities
+from travel_dashboard.data.event_table import build_event_table
+from travel_dashboard.data.forecast import forecast_frames
+from travel_dashboard.data.hotel_table import build_hotel_table
+
+# Headless batch export of the dashboard's data for many cities, without Streamlit. It
+# runs the same api/ fetchers and data/ transforms as the pages (and fills the same
+# response cache), a few cities at a time, and writes one normalized table per dataset:
+#   events   one row per event within 25 km of the city (data/event_table.py)
+#   weather  one row per forecast day inside the date window (data/forecast.py)
+#   hotels   one row per hotel around the city centre (data/hotel_table.py)
+# The date window of events and weather runs from --start to --end, both included.
+# Finished cities are written in chunks of part files (<output>/<dataset>/part-NNNNN.jsonl
+# or .parquet, renamed into place once complete), so memory stays bounded by the chunk
+# size however many cities are exported. After each chunk its cities are appended to
+# a checkpoint file; a rerun with the same arguments skips them and continues where an
+# interrupted run stopped. A city is only written when every dataset succeeded, so
+# cities that failed are retried by the next run.
+#
+#   python -m travel_dashboard.batch --country Japan --min-population 500000 \
+#       --start 2026-11-01 --end 2026-11-08 --output exports/japan --format parquet
+
+DATASETS = ["events", "weather", "hotels"]
+DATASET_SECRETS = {"events": "ticketmaster_key", "weather": "openweather_key", "hotels": "google_key"}
+FORMATS = {"jsonl": "jsonl", "parquet": "parquet"}  # format -> file extension
+CITIES_CSV = "worldcities.csv"
+DEFAULT_DAYS = 7
+MAX_WORKERS = 4  # cities fetched at once; each fans out its own event pages
+CHUNK_CITIES = 50
+MAX_FAILURES = 25  # consecutive failed cities before the run stops (e.g. a used-up quota)
+
+BatchConfig = namedtuple("BatchConfig", ["start_date", "end_date", "datasets", "categories", "hotel_radius",
+                                         "output_format"])
+CityResult = namedtuple("CityResult", ["key", "frames", "failures"])
+
+
+# Names repeat within a region, so the key includes the coordinates
+def city_key(city):
+    return f"{city.name}|{city.admin}|{city.country}|{city.lat:.4f},{city.lng:.4f}"
+
+
+def _city(row):
+    return City(row.city, row.country, row.admin_name, float(row.lat), float(row.lng), float(row.population))
+
+
+# Function to pick the cities of a run: the given names (largest city of each name, or
+# "Name, Country"), or every city of worldcities.csv matching the filters, most
+# populous first
+def select_cities(csv_path, names=None, countries=None, min_population=None, limit=None):
+    frame = read_cities(csv_path)
+    if names:
+        by_name = {row.city: row for row in frame.drop_duplicates("city").itertuples(index=False)}
+        by_name_country = {(row.city, row.country): row
+                           for row in frame.drop_duplicates(["city", "country"]).itertuples(index=False)}
+        cities, unknown = [], []
+        for name in names:
+            city_name, _, country = (part.strip() for part in name.rpartition(","))
+            row = by_name_country.get((city_name, country)) if city_name else None
+            row = row or by_name.get(name.strip())
+            if row is None:
+                unknown.append(name)
+            else:
+                cities.append(_city(row))
+        return cities, unknown
+
+    if countries:
+        frame = frame[frame["country"].isin(countries)]
+    if min_population:
+        frame = frame[frame["population"] >= min_population]
+    if limit:
+        frame = frame.head(limit)
+    return [_city(row) for row in frame.itertuples(index=False)], []
+
+
+# Function to fetch and normalize every dataset of one city (safe to call from worker
+# threads). Its requests run at background priority, behind interactive sessions. Events
+# and weather are looked up around the city's coordinates rather than by name, so that
+# e.g. Paris, United States does not get the data of Paris, France. end_date is the last
+# day exported for every dataset.
+def export_city(city, config):
+    frames, failures = {}, []
+    near = (city.lat, city.lng)
+    with rate_limit.prioritized(rate_limit.BACKGROUND):
+        if "events" in config.datasets:
+            # Event searches end before their end date
+            events, failed_pages = ticketmaster.fetch_all_events(city.name, config.start_date,
+                                                                 config.end_date + timedelta(days=1),
+                                                                 config.categories, near=near)
+            if failed_pages:
+                failures.append(f"events: {', '.join(failed_pages)}")
+            frames["events"] = build_event_table(events)
+
+        if "weather" in config.datasets:
+            try:
+                weather_data = openweather.fetch_weather_data(city.name, near=near)
+                if weather_data is None:
+                    failures.append("weather: forecast could not be retrieved")
+                else:
+                    daily = forecast_frames(weather_data).daily
+                    in_window = daily["date"].between(config.start_date.isoformat(), config.end_date.isoformat())
+                    frames["weather"] = daily[in_window]
+            except rate_limit.RateLimitError as error:
+                failures.append(f"weather: {error}")
+
+        if "hotels" in config.datasets:
+            try:
+                hotels = places.fetch_hotels(get_secret("google_key"), f"{city.lat:.5f},{city.lng:.5f}",
+                                             config.hotel_radius)
+                frames["hotels"] = build_hotel_table(hotels)
+            except (requests.exceptions.RequestException, ValueError) as error:
+                failures.append(f"hotels: {error}")
+
+    for frame in frames.values():
+        frame.insert(0, "city", city.name)
+        frame.insert(1, "country", city.country)
+    return CityResult(city_key(city), frames, failures)
+
+
+# Completed cities of earlier runs. The first line holds the run parameters, every
+# further line the cities of one written part.
+class Checkpoint:
+    def __init__(self, path, params):
+        self.path = path
+        self.done = set()
+        self.parts = 0
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._append({"params": params})
+            return
+
+        with open(path) as checkpoint_file:
+            text = checkpoint_file.read()
+        lines = text.splitlines()
+        if not text.endswith("\n"):
+            # A crash cut the last record short; its part is rewritten by this run
+            lines = lines[:-1]
+            with open(path, "w") as checkpoint_file:
+                checkpoint_file.write("".join(f"{line}\n" for line in lines))
+        records = [json.loads(line) for line in lines]
+        if not records or records[0].get("params") != params:
+            raise ValueError(f"{path} belongs to a run with other parameters; use another output or checkpoint")
+        for record in records[1:]:
+            self.done.update(record["cities"])
+            self.parts = record["part"] + 1
+
+    def _append(self, record):
+        with open(self.path, "a") as checkpoint_file:
+            checkpoint_file.write(json.dumps(record) + "\n")
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+
+    def record(self, part, cities, rows):
+        self._append({"part": part, "cities": cities, "rows": rows, "time": time.time()})
+        self.done.update(cities)
+        self.parts = part + 1
+
+
+class PartWriter:
+    def __init__(self, output_dir, output_format, datasets, first_part):
+        self.output_dir = output_dir
+        self.output_format = output_format
+        self.extension = FORMATS[output_format]
+        for dataset in datasets:
+            os.makedirs(os.path.join(output_dir, dataset), exist_ok=True)
+            # Parts written after the last checkpoint record belong to no completed chunk
+            for path in glob.glob(os.path.join(output_dir, dataset, f"part-*.{self.extension}*")):
+                number = os.path.basename(path).split(".")[0].removeprefix("part-")
+                if not number.isdigit() or int(number) >= first_part:
+                    os.remove(path)
+
+    # Function to write the rows of one dataset for one chunk. Returns the row count.
+    def write(self, part, dataset, frames):
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return 0
+        table = pd.concat(frames, ignore_index=True)
+        path = os.path.join(self.output_dir, dataset, f"part-{part:05d}.{self.extension}")
+        tmp_path = f"{path}.tmp"
+        if self.output_format == "parquet":
+            for column in table.select_dtypes("category").columns:
+                table[column] = table[column].astype(str)
+            table.to_parquet(tmp_path, index=False)
+        else:
+            # Widened through their shortest text form, float32 values print as 40.76, not 40.7599983215
+            for column in table.select_dtypes("float32").columns:
+                table[column] = table[column].astype(str).astype("float64")
+            table.to_json(tmp_path, orient="records", lines=True, force_ascii=False)
+        os.replace(tmp_path, path)
+        return len(table)
+
+
+# Function to export every city not yet in the checkpoint. Returns (exported, failed).
+def run_batch(cities, config, output_dir, checkpoint_path=None, workers=MAX_WORKERS, chunk_cities=CHUNK_CITIES,
+              max_failures=MAX_FAILURES, log=print):
+    params = {**config._asdict(), "start_date": config.start_date.isoformat(),
+              "end_date": config.end_date.isoformat()}
+    checkpoint = Checkpoint(checkpoint_path or os.path.join(output_dir, "checkpoint.jsonl"), params)
+    writer = PartWriter(output_dir, config.output_format, config.datasets, checkpoint.parts)
+    todo = iter([city for city in cities if city_key(city) not in checkpoint.done])
+    if checkpoint.done:
+        log(f"Resuming: {len(checkpoint.done)} cities already exported in {checkpoint.parts} parts")
+
+    chunk = []
+    exported = failed = consecutive_failures = 0
+
+    def flush():
+        nonlocal exported
+        if not chunk:
+            return
+        part = checkpoint.parts
+        rows = {dataset: writer.write(part, dataset, [result.frames[dataset] for result in chunk])
+                for dataset in config.datasets}
+        checkpoint.record(part, [result.key for result in chunk], rows)
+        exported += len(chunk)
+        log(f"part {part}: {len(chunk)} cities, " + ", ".join(f"{count} {name}" for name, count in rows.items())
+            + f" ({exported} exported, {failed} failed)")
+        chunk.clear()
+
+    # Only a few cities are in flight at a time, so results never pile up in memory
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch")
+    in_flight = {}
+    try:
+        while True:
+            while len(in_flight) < workers * 2:
+                city = next(todo, None)
+                if city is None:
+                    break
+                in_flight[executor.submit(export_city, city, config)] = city
+            if not in_flight:
+                break
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                city = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except (requests.exceptions.RequestException, ValueError) as error:
+                    result = CityResult(city_key(city), {}, [str(error)])
+                if result.failures:
+                    failed += 1
+                    consecutive_failures += 1
+                    log(f"{city.name}, {city.country}: " + "; ".join(result.failures))
+                else:
+                    consecutive_failures = 0
+                    chunk.append(result)
+                    if len(chunk) >= chunk_cities:
+                        flush()
+            if consecutive_failures >= max_failures:
+                log(f"Stopping after {consecutive_failures} failed cities in a row; rerun to resume")
+                break
+    finally:
+        # Cities still in flight are dropped and fetched again by the next run
+        executor.shutdown(wait=False, cancel_futures=True)
+        flush()
+    return exported, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export events, weather and hotels for many cities.")
+    selection = parser.add_argument_group("cities")
+    selection.add_argument("--cities", nargs="+", metavar="CITY", help='city names, e.g. Paris "Paris, United States"')
+    selection.add_argument("--cities-file", help="file with one city name per line")
+    selection.add_argument("--country", action="append", help="only cities of this country (repeatable)")
+    selection.add_argument("--min-population", type=float)
+    selection.add_argument("--limit", type=int, help="only the most populous N matching cities")
+    selection.add_argument("--cities-csv", default=CITIES_CSV)
+    parser.add_argument("--start", type=date.fromisoformat, default=date.today(), help="first day, YYYY-MM-DD")
+    parser.add_argument("--end", type=date.fromisoformat,
+                        help=f"last day, included (default: start + {DEFAULT_DAYS} days)")
+    parser.add_argument("--datasets", nargs="+", choices=DATASETS, default=DATASETS)
+    parser.add_argument("--categories", nargs="+", choices=ticketmaster.CATEGORIES, default=ticketmaster.CATEGORIES)
+    parser.add_argument("--hotel-radius", type=int, default=5000, help="meters around the city centre")
+    parser.add_argument("--output", required=True, help="output directory")
+    parser.add_argument("--format", choices=FORMATS, default="jsonl")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <output>/checkpoint.jsonl)")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="cities fetched concurrently")
+    parser.add_argument("--chunk", type=int, default=CHUNK_CITIES, help="cities per part file")
+    parser.add_argument("--max-failures", type=int, default=MAX_FAILURES,
+                        help="consecutive failed cities before the run stops")
+    args = parser.parse_args()
+
+    end_date = args.end or args.start + timedelta(days=DEFAULT_DAYS)
+    if end_date < args.start:
+        parser.error("--end is before --start")
+    if args.format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            parser.error("Parquet output needs pyarrow (pip install pyarrow)")
+    for dataset in args.datasets:
+        try:
+            get_secret(DATASET_SECRETS[dataset])
+        except MissingSecret as error:
+            parser.error(error.args[0])
+
+    names = list(args.cities or [])
+    if args.cities_file:
+        with open(args.cities_file) as cities_file:
+            names.extend(line.strip() for line in cities_file if line.strip())
+    cities, unknown = select_cities(args.cities_csv, names, args.country, args.min_population, args.limit)
+    for name in unknown:
+        print(f"Unknown city: {name}", file=sys.stderr)
+    if not cities:
+        parser.error("no cities selected")
+
+    config = BatchConfig(start_date=args.start, end_date=end_date, datasets=args.datasets,
+                         categories=args.categories, hotel_radius=args.hotel_radius, output_format=args.format)
+    print(f"Exporting {', '.join(args.datasets)} for {len(cities)} cities, {args.start} to {end_date}", flush=True)
+    try:
+        exported, failed = run_batch(cities, config, args.output, args.checkpoint, args.workers, args.chunk,
+                                     args.max_failures, log=lambda message: print(message, flush=True))
+    except ValueError as error:
+        parser.error(str(error))
+    except KeyboardInterrupt:
+        print("Interrupted; finished cities were saved, rerun the same command to resume", file=sys.stderr)
+        sys.exit(130)
+    print(f"Done: {exported} cities exported, {failed} failed", flush=True)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
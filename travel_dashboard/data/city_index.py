@@ -0,0 +1,196 @@
+import bisect
+import glob
+import os
+import unicodedata
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from travel_dashboard import CACHE_DIR
+
+# Compact in-memory index over worldcities.csv. Only the columns the dashboard uses are
+# kept (strings as categoricals where names repeat, coordinates as float32), and the
+# parsed table is cached as Parquet next to the response cache so later processes skip
+# the CSV parse. The binary copy is rebuilt whenever the CSV's mtime or size changes.
+#
+# The index also answers typeahead queries: a sorted prefix table over every word of
+# every name (native and ASCII spelling) finds prefix matches with two binary searches,
+# and a trigram table catches misspellings and infix matches. Rows are ordered by
+# population, so ranking by population is just taking the lowest row numbers.
+
+CITY_COLUMNS = ["city", "city_ascii", "country", "admin_name", "lat", "lng", "population"]
+INDEX_VERSION = 2  # bump when the cached table layout changes
+
+# Prefixes this short match most of the table; their top results are precomputed
+PRECOMPUTED_PREFIX_LENGTH = 2
+MAX_RESULTS = 25
+
+City = namedtuple("City", ["name", "country", "admin", "lat", "lng", "population"])
+
+
+# Function to format a City record for display, e.g. "Paris, Texas, United States"
+def city_label(city):
+    parts = [city.name, city.admin, city.country]
+    unique_parts = [part for i, part in enumerate(parts) if part and part not in parts[:i]]
+    return ", ".join(unique_parts)
+
+
+# Function to fold case and accents so "sao" finds "São Paulo"
+def normalize(text):
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold().strip()
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+# Lowest k distinct rows of an array of rows, i.e. the k most populous cities
+def _top_rows(rows, k):
+    return np.unique(rows)[:k]
+
+
+# Function to read the city table, from the binary copy when it is up to date
+def read_cities(csv_path, cache_dir=CACHE_DIR):
+    stat = os.stat(csv_path)
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    cache_path = os.path.join(cache_dir, f"{stem}-v{INDEX_VERSION}-{stat.st_mtime_ns}-{stat.st_size}.parquet")
+    if os.path.exists(cache_path):
+        try:
+            return pd.read_parquet(cache_path)
+        except (OSError, ValueError):
+            pass  # unreadable copy, rebuild it below
+
+    frame = pd.read_csv(csv_path, usecols=CITY_COLUMNS)
+    frame = frame.dropna(subset=["city", "lat", "lng"])
+    frame = frame.sort_values("population", ascending=False, kind="stable", na_position="last")
+    frame = frame.reset_index(drop=True)
+    frame["city"] = frame["city"].astype(str)
+    frame["city_ascii"] = frame["city_ascii"].fillna(frame["city"]).astype(str)
+    frame["country"] = frame["country"].fillna("").astype("category")
+    frame["admin_name"] = frame["admin_name"].fillna("").astype("category")
+    frame["lat"] = frame["lat"].astype(np.float32)
+    frame["lng"] = frame["lng"].astype(np.float32)
+    frame["population"] = frame["population"].astype(np.float32)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        for old_path in glob.glob(os.path.join(cache_dir, f"{stem}-*.parquet")):
+            os.remove(old_path)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        frame.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, cache_path)
+    except (OSError, ImportError, ValueError):
+        pass  # the cache is only an optimization
+    return frame
+
+
+class CityIndex:
+    def __init__(self, frame):
+        self.frame = frame
+        self._lat = frame["lat"].to_numpy()
+        self._lng = frame["lng"].to_numpy()
+        self._population = frame["population"].to_numpy()
+        self._cities = frame["city"].tolist()
+        self._countries = frame["country"].astype(str).tolist()
+        self._admins = frame["admin_name"].astype(str).tolist()
+
+        # Rows are ordered by population, so the first row of a name is its largest city
+        self._by_city = {}
+        self._by_city_country = {}
+        for row, (city, country) in enumerate(zip(self._cities, self._countries)):
+            self._by_city.setdefault(city, row)
+            self._by_city_country.setdefault((city, country), row)
+        self.default_city = self._cities[0] if self._cities else None
+
+        self._build_search_index(frame["city_ascii"].tolist())
+
+    def _build_search_index(self, ascii_names):
+        entries = set()
+        trigram_rows = {}
+        for row, names in enumerate(zip(self._cities, ascii_names)):
+            for name in {normalize(name) for name in names}:
+                words = name.split()
+                # Every word start is a key, so "york" finds "New York"
+                for i in range(len(words)):
+                    entries.add((" ".join(words[i:]), row))
+                for trigram in _trigrams(name):
+                    trigram_rows.setdefault(trigram, []).append(row)
+        entries = sorted(entries)
+        self._keys = [key for key, _ in entries]
+        self._key_rows = np.fromiter((row for _, row in entries), dtype=np.int32, count=len(entries))
+        self._trigram_rows = {trigram: np.unique(np.asarray(rows, dtype=np.int32))
+                              for trigram, rows in trigram_rows.items()}
+
+        self._short_prefixes = {}
+        for length in range(1, PRECOMPUTED_PREFIX_LENGTH + 1):
+            start = 0
+            while start < len(self._keys):
+                prefix = self._keys[start][:length]
+                end = bisect.bisect_left(self._keys, prefix + "\uffff", start)
+                if len(prefix) == length:
+                    self._short_prefixes[prefix] = _top_rows(self._key_rows[start:end], MAX_RESULTS)
+                start = end
+
+    @classmethod
+    def load(cls, csv_path):
+        return cls(read_cities(csv_path))
+
+    def __len__(self):
+        return len(self._cities)
+
+    def __contains__(self, city):
+        return city in self._by_city
+
+    # Row of a city; country disambiguates duplicate names (e.g. Paris, France / Texas)
+    def row(self, city, country=None):
+        if country is not None:
+            return self._by_city_country.get((city, country))
+        return self._by_city.get(city)
+
+    # Function to look up the coordinates of a city as (lat, lng), or None if unknown
+    def lookup(self, city, country=None):
+        row = self.row(city, country)
+        if row is None:
+            return None
+        return float(self._lat[row]), float(self._lng[row])
+
+    def record(self, row):
+        return City(self._cities[row], self._countries[row], self._admins[row],
+                    float(self._lat[row]), float(self._lng[row]), float(self._population[row]))
+
+    # Function to format a row for the result list
+    def label(self, row):
+        return city_label(self.record(row))
+
+    # Function to find the k most populous cities matching a typed query. Prefix matches
+    # on any word come first; trigram matches fill the list when there are too few.
+    def search(self, query, k=10):
+        query = normalize(query)
+        if not query:
+            return []
+        k = min(k, MAX_RESULTS)
+        if query in self._short_prefixes:
+            rows = self._short_prefixes[query][:k]
+        else:
+            start = bisect.bisect_left(self._keys, query)
+            end = bisect.bisect_left(self._keys, query + "\uffff", start)
+            rows = _top_rows(self._key_rows[start:end], k)
+        rows = rows.tolist()
+        if len(rows) < k:
+            rows.extend(row for row in self._fuzzy_search(query, k) if row not in rows)
+        return rows[:k]
+
+    # Rows sharing the most trigrams with the query, most populous first among equals
+    def _fuzzy_search(self, query, k):
+        trigrams = _trigrams(query)
+        postings = [self._trigram_rows[t] for t in trigrams if t in self._trigram_rows]
+        if not postings:
+            return []
+        rows, counts = np.unique(np.concatenate(postings), return_counts=True)
+        keep = counts >= max(1, len(trigrams) // 2)
+        rows, counts = rows[keep], counts[keep]
+        order = np.lexsort((rows, -counts))[:k]
+        return rows[order].tolist()
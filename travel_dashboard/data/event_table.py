@@ -0,0 +1,40 @@
+import pandas as pd
+
+from travel_dashboard import metrics
+
+# Compact model of a Ticketmaster event search. Raw event dicts carry images in every
+# resolution, classifications, sales windows, promoters and the full venue records,
+# while the Events page shows only a handful of fields. A search is projected once into
+# a table with one row per event: repeated strings (dates, venues, addresses) are
+# categoricals and coordinates are float32, and the list, the map and session state all
+# read from it instead of the raw JSON.
+
+EVENT_COLUMNS = ["id", "name", "date", "venue", "address", "lat", "lng", "url", "image"]
+CATEGORY_COLUMNS = ["date", "venue", "address"]
+
+
+def _event_row(event):
+    venue = event.get('_embedded', {}).get('venues', [{}])[0]
+    location = venue.get('location', {})
+    return (
+        event.get('id'),
+        event.get('name', 'N/A'),
+        event.get('dates', {}).get('start', {}).get('localDate', 'N/A'),
+        venue.get('name', 'N/A'),
+        venue.get('address', {}).get('line1', 'Address not available'),
+        location.get('latitude') or None,
+        location.get('longitude') or None,
+        event.get('url', '#'),
+        (event.get('images') or [{}])[0].get('url') or '',
+    )
+
+
+# Function to project raw events (already sorted) into the compact events table
+@metrics.timed("transform")
+def build_event_table(events):
+    table = pd.DataFrame([_event_row(event) for event in events], columns=EVENT_COLUMNS)
+    for column in CATEGORY_COLUMNS:
+        table[column] = table[column].astype("category")
+    for column in ["lat", "lng"]:
+        table[column] = pd.to_numeric(table[column], errors="coerce").astype("float32")
+    return table
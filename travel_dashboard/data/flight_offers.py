@@ -0,0 +1,162 @@
+import re
+from collections import namedtuple
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from travel_dashboard import metrics
+
+# Columnar model of an Amadeus flight-offers response. The nested offer JSON is walked
+# once into an offers table (one row per offer) and a segments table (one row per
+# flight segment), and every filter, sort and aggregate afterwards is a vectorized
+# pandas operation on those tables, so refining results never re-queries Amadeus.
+
+FlightTable = namedtuple("FlightTable", ["offers", "segments"])
+
+STOP_OPTIONS = ["All", "Non-stop", "1 Stop", "2+ Stops"]
+SORT_OPTIONS = {
+    "Price": ["price", "duration_min"],
+    "Total duration": ["duration_min", "price"],
+    "Departure time": ["departure", "price"],
+}
+
+OFFER_COLUMNS = ["offer", "price", "currency", "duration_min", "stops_out", "stops_in",
+                 "carrier", "carrier_name", "route_out", "route_in", "departure", "arrival",
+                 "return_departure", "return_arrival"]
+SEGMENT_COLUMNS = ["offer", "leg", "segment", "carrier", "carrier_name", "number", "aircraft",
+                   "aircraft_name", "origin", "destination", "departure", "arrival", "duration_min"]
+
+_DURATION = re.compile(r"P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?")
+
+
+# Function to convert an ISO 8601 duration such as "PT5H30M" into minutes
+def duration_minutes(duration_str):
+    match = _DURATION.fullmatch(duration_str or "")
+    if not match:
+        return 0
+    days, hours, minutes = (int(value) if value else 0 for value in match.groups())
+    return days * 1440 + hours * 60 + minutes
+
+
+# Function to flatten offers and their dictionaries into the offers/segments tables
+@metrics.timed("transform")
+def flatten_offers(flights, dictionaries):
+    carriers = dictionaries.get("carriers", {})
+    aircraft_types = dictionaries.get("aircraft", {})
+
+    offer_rows = []
+    segment_rows = []
+    for offer, flight in enumerate(flights):
+        itineraries = flight.get("itineraries", [])
+        legs = []
+        for leg, itinerary in enumerate(itineraries[:2]):
+            segments = itinerary.get("segments", [])
+            if not segments:
+                continue
+            for number, segment in enumerate(segments):
+                carrier_code = segment.get("carrierCode", "Unknown")
+                aircraft_code = segment.get("aircraft", {}).get("code", "Unknown")
+                segment_rows.append((
+                    offer, leg, number, carrier_code, carriers.get(carrier_code, "Unknown Airline"),
+                    segment.get("number", "N/A"), aircraft_code,
+                    aircraft_types.get(aircraft_code, "Unknown Aircraft"),
+                    segment["departure"]["iataCode"], segment["arrival"]["iataCode"],
+                    segment["departure"]["at"], segment["arrival"]["at"],
+                    duration_minutes(segment.get("duration")),
+                ))
+            legs.append((segments, duration_minutes(itinerary.get("duration"))))
+        if not legs:
+            continue
+
+        out_segments, out_minutes = legs[0]
+        in_segments, in_minutes = legs[1] if len(legs) > 1 else ([], 0)
+        carrier_code = out_segments[0].get("carrierCode", "Unknown")
+        offer_rows.append((
+            offer, float(flight["price"]["grandTotal"]), flight["price"].get("currency", "USD"),
+            out_minutes + in_minutes, len(out_segments) - 1, len(in_segments) - 1 if in_segments else -1,
+            carrier_code, carriers.get(carrier_code, "Unknown Airline"),
+            f"{out_segments[0]['departure']['iataCode']} - {out_segments[-1]['arrival']['iataCode']}",
+            f"{in_segments[0]['departure']['iataCode']} - {in_segments[-1]['arrival']['iataCode']}"
+            if in_segments else None,
+            out_segments[0]["departure"]["at"], out_segments[-1]["arrival"]["at"],
+            in_segments[0]["departure"]["at"] if in_segments else None,
+            in_segments[-1]["arrival"]["at"] if in_segments else None,
+        ))
+
+    offers = pd.DataFrame(offer_rows, columns=OFFER_COLUMNS)
+    segments = pd.DataFrame(segment_rows, columns=SEGMENT_COLUMNS)
+    for frame, columns in [(offers, ["departure", "arrival", "return_departure", "return_arrival"]),
+                           (segments, ["departure", "arrival"])]:
+        for column in columns:
+            frame[column] = pd.to_datetime(frame[column], format="ISO8601")
+    offers = offers.astype({"offer": np.int32, "duration_min": np.int32, "stops_out": np.int8,
+                            "stops_in": np.int8, "currency": "category", "carrier": "category",
+                            "carrier_name": "category"})
+    segments = segments.astype({"offer": np.int32, "leg": np.int8, "segment": np.int8,
+                                "duration_min": np.int32, "carrier": "category",
+                                "carrier_name": "category", "aircraft_name": "category"})
+    return FlightTable(offers, segments)
+
+
+def _stops_mask(stops, max_stops):
+    if max_stops == "Non-stop":
+        return stops == 0
+    if max_stops == "1 Stop":
+        return stops == 1
+    return stops >= 2
+
+
+# Function to filter offers. An offer matches a stop option when either of its legs does.
+def filter_offers(offers, max_stops="All", price_range=None, carriers=None, departure_hours=None):
+    mask = pd.Series(True, index=offers.index)
+    if max_stops != "All":
+        mask &= _stops_mask(offers["stops_out"], max_stops) | _stops_mask(offers["stops_in"], max_stops)
+    if price_range is not None:
+        mask &= offers["price"].between(*price_range)
+    if carriers:
+        mask &= offers["carrier_name"].isin(carriers)
+    if departure_hours is not None:
+        mask &= offers["departure"].dt.hour.between(departure_hours[0], departure_hours[1] - 1)
+    return offers[mask]
+
+
+def sort_offers(offers, sort_by="Price"):
+    return offers.sort_values(SORT_OPTIONS[sort_by], kind="stable")
+
+
+# Offers no other offer beats on both price and total duration
+def pareto_offers(offers):
+    ordered = offers.sort_values(["price", "duration_min"], kind="stable")
+    best_duration_so_far = ordered["duration_min"].cummin().shift(fill_value=np.iinfo(np.int32).max)
+    return ordered[ordered["duration_min"] < best_duration_so_far]
+
+
+def mean_price_by_carrier(offers):
+    return offers.groupby("carrier_name", observed=True, as_index=False)["price"].mean()
+
+
+# Function to list the (departure, return) date pairs of a ±flex_days grid around the
+# requested dates, nearest to the requested pair first. One-way trips have no return.
+def flexible_date_pairs(departure_date, return_date, flex_days, today=None):
+    today = today or date.today()
+    offsets = sorted(range(-flex_days, flex_days + 1), key=abs)
+    departures = [departure_date + timedelta(days=offset) for offset in offsets]
+    departures = [day for day in departures if day >= today]
+    if return_date is None:
+        return [(day, None) for day in departures]
+    pairs = [(departure, return_date + timedelta(days=offset))
+             for departure in departures for offset in offsets]
+    pairs = [(departure, back) for departure, back in pairs if back >= departure]
+    return sorted(pairs, key=lambda pair: abs((pair[0] - departure_date).days) + abs((pair[1] - return_date).days))
+
+
+# Compact price matrix: departure dates as rows, return dates (or "One-way") as columns
+def empty_price_calendar(pairs):
+    departures = sorted({departure for departure, _ in pairs})
+    returns = sorted({back for _, back in pairs if back is not None}) or ["One-way"]
+    return pd.DataFrame(np.nan, index=departures, columns=returns, dtype=np.float32)
+
+
+def set_calendar_price(calendar, departure_date, return_date, price):
+    calendar.loc[departure_date, return_date if return_date is not None else "One-way"] = price
@@ -0,0 +1,93 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Shared model of an OpenWeather 5 day / 3 hour forecast. The payload is parsed once
+# into a typed DataFrame of 3-hour slots, and the daily view is computed from it with
+# one vectorized groupby, so every weather view reads real daily extremes instead of
+# the first slot of each day.
+
+Forecast = namedtuple("Forecast", ["hourly", "daily"])
+
+HOURLY_COLUMNS = ["time_utc", "local_time", "date", "temp", "temp_min", "temp_max",
+                  "rain", "wind_speed", "humidity", "description"]
+DAILY_COLUMNS = ["date", "temp_min", "temp_max", "rain", "wind_speed", "humidity", "description"]
+
+
+# Function to parse an OpenWeather forecast payload into hourly slots
+def parse_hourly(weather_data):
+    items = weather_data.get("list", [])
+    if not items:
+        return pd.DataFrame(columns=HOURLY_COLUMNS)
+    slots = pd.json_normalize(items)
+    offset = pd.Timedelta(seconds=weather_data.get("city", {}).get("timezone", 0))
+
+    hourly = pd.DataFrame({"time_utc": pd.to_datetime(slots["dt"], unit="s", utc=True)})
+    # Days are grouped in the city's local time, not in UTC
+    hourly["local_time"] = (hourly["time_utc"] + offset).dt.tz_localize(None)
+    hourly["date"] = hourly["local_time"].dt.strftime("%Y-%m-%d")
+    for column, source in [("temp", "main.temp"), ("temp_min", "main.temp_min"),
+                           ("temp_max", "main.temp_max"), ("wind_speed", "wind.speed"),
+                           ("humidity", "main.humidity"), ("rain", "rain.3h")]:
+        values = slots[source] if source in slots else pd.Series(np.nan, index=slots.index)
+        hourly[column] = values.astype("float32")
+    hourly["rain"] = hourly["rain"].fillna(0)
+    hourly["description"] = pd.Categorical(
+        [item["weather"][0]["description"] if item.get("weather") else "" for item in items])
+    return hourly[HOURLY_COLUMNS]
+
+
+# Function to aggregate hourly slots into one row per local day
+def aggregate_daily(hourly):
+    if hourly.empty:
+        return pd.DataFrame(columns=DAILY_COLUMNS)
+    daily = hourly.groupby("date", sort=True).agg(
+        temp_min=("temp_min", "min"),
+        temp_max=("temp_max", "max"),
+        rain=("rain", "sum"),
+        wind_speed=("wind_speed", "max"),
+        humidity=("humidity", "mean"),
+    )
+    # Most frequent condition of the day
+    conditions = (hourly.groupby(["date", "description"], observed=True).size()
+                  .rename("slots").reset_index()
+                  .sort_values(["date", "slots"], ascending=[True, False], kind="stable")
+                  .drop_duplicates("date")
+                  .set_index("date")["description"])
+    daily["description"] = conditions.astype(str)
+    return daily.reset_index()[DAILY_COLUMNS]
+
+
+def forecast_frames(weather_data):
+    hourly = parse_hourly(weather_data)
+    return Forecast(hourly, aggregate_daily(hourly))
+
+
+# Function to stack the daily rows of several forecasts into one frame with a city column
+def stack_daily(daily_by_city):
+    frames = [daily.assign(city=city) for city, daily in daily_by_city.items() if not daily.empty]
+    if not frames:
+        return pd.DataFrame(columns=["city"] + DAILY_COLUMNS)
+    stacked = pd.concat(frames, ignore_index=True)
+    stacked["city"] = pd.Categorical(stacked["city"], categories=list(daily_by_city))
+    return stacked[["city"] + DAILY_COLUMNS]
+
+
+# Function to rank destinations over the trip dates. Each city is ranked on total rain,
+# mean daily high and strongest wind, and the average of the three ranks orders them.
+def rank_destinations(stacked, start_date, end_date):
+    trip = stacked[stacked["date"].between(str(start_date), str(end_date))]
+    summary = trip.assign(dry=trip["rain"] < 1).groupby("city", observed=True).agg(
+        rain=("rain", "sum"),
+        temp_max=("temp_max", "mean"),
+        temp_min=("temp_min", "mean"),
+        wind_speed=("wind_speed", "max"),
+        dry_days=("dry", "sum"),
+        days=("date", "size"),
+    )
+    summary["score"] = (summary["rain"].rank() + summary["temp_max"].rank(ascending=False)
+                        + summary["wind_speed"].rank()) / 3
+    summary = summary.sort_values(["score", "rain"], kind="stable").reset_index()
+    summary.insert(0, "rank", np.arange(1, len(summary) + 1))
+    return summary
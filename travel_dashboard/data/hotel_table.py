@@ -0,0 +1,32 @@
+import pandas as pd
+
+from travel_dashboard import metrics
+
+# Flat model of Google Places lodging results: one row per hotel with the fields the
+# dashboard and the batch export use, coordinates as float32.
+
+HOTEL_COLUMNS = ["place_id", "name", "rating", "ratings", "price_level", "address", "lat", "lng"]
+
+
+def _hotel_row(hotel):
+    location = hotel.get('geometry', {}).get('location', {})
+    return (
+        hotel.get('place_id'),
+        hotel.get('name', 'N/A'),
+        hotel.get('rating'),
+        hotel.get('user_ratings_total'),
+        hotel.get('price_level'),
+        hotel.get('vicinity', ''),
+        location.get('lat'),
+        location.get('lng'),
+    )
+
+
+# Function to flatten Places results into the hotels table
+@metrics.timed("transform")
+def build_hotel_table(hotels):
+    table = pd.DataFrame([_hotel_row(hotel) for hotel in hotels], columns=HOTEL_COLUMNS)
+    for column in ["rating", "price_level", "lat", "lng"]:
+        table[column] = pd.to_numeric(table[column], errors="coerce").astype("float32")
+    table["ratings"] = pd.to_numeric(table["ratings"], errors="coerce").astype("Int32")
+    return table
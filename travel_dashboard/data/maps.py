@@ -0,0 +1,88 @@
+import html
+
+import pandas as pd
+
+from travel_dashboard import metrics
+
+# Clustered Folium maps for hotels and event venues. Markers are passed to the browser
+# as one array of [lat, lng, popup, tooltip] rows and created client-side by a single
+# FastMarkerCluster layer, instead of one folium.Marker (and one HTML popup element)
+# per point. Events sharing a venue become one marker whose popup lists all of them.
+
+MARKER_CALLBACK = """
+function (row) {
+    var marker = L.marker(new L.LatLng(row[0], row[1]));
+    marker.bindPopup(row[2], {maxWidth: 300});
+    marker.bindTooltip(row[3]);
+    return marker;
+}
+"""
+
+
+# Function to turn hotel results into marker rows
+@metrics.timed("transform")
+def hotel_points(hotels):
+    points = []
+    for hotel in hotels:
+        location = hotel['geometry']['location']
+        name = html.escape(hotel['name'])
+        price_level = hotel.get('price_level')
+        popup = (f"{name}<br>Rating: {hotel.get('rating', 'N/A')}⭐"
+                 f"<br>Address: {html.escape(hotel.get('vicinity', 'N/A'))}"
+                 f"<br>Price Level: {'$' * price_level if price_level else 'N/A'}")
+        points.append((float(location['lat']), float(location['lng']), popup, name))
+    return tuple(points)
+
+
+# Function to turn a hotels table (see hotel_table.py) and its ranking against the events
+# of a search (see proximity.py) into marker rows labelled with each hotel's rank
+@metrics.timed("transform")
+def ranked_hotel_points(table, ranking, radius_km):
+    frame = table.join(ranking)
+    frame = frame[frame["lat"].notna() & frame["lng"].notna()].sort_values("rank")
+    if frame.empty:
+        return ()
+
+    names = frame["name"].astype(str).map(html.escape)
+    ranks = "#" + frame["rank"].astype(str)
+    ratings = frame["rating"].map(lambda rating: "N/A" if pd.isna(rating) else f"{rating:g}")
+    prices = frame["price_level"].map(lambda level: "$" * int(level) if level > 0 else "N/A")
+    popup = ("<b>" + ranks + " " + names + "</b><br>Rating: " + ratings + "⭐"
+             + "<br>Address: " + frame["address"].astype(str).map(html.escape)
+             + "<br>Price Level: " + prices
+             + "<br>" + frame["events_nearby"].astype(str) + f" events within {radius_km:g} km")
+    points = pd.DataFrame({"lat": frame["lat"].astype("float64").round(6), "lng": frame["lng"].astype("float64").round(6),
+                           "popup": popup, "tooltip": ranks + " " + names})
+    return tuple(points.itertuples(index=False, name=None))
+
+
+# Function to turn an events table (see event_table.py) into one marker row per venue
+@metrics.timed("transform")
+def venue_points(table):
+    frame = table[table["lat"].notna() & table["lng"].notna()]
+    if frame.empty:
+        return ()
+
+    lines = "<li>" + frame["date"].astype(str) + ": " + frame["name"].map(html.escape) + "</li>"
+    venues = lines.groupby([frame["lat"], frame["lng"], frame["venue"], frame["address"]], sort=False,
+                           observed=True).agg(lines="".join, count="size").reset_index()
+    venue_names = venues["venue"].astype(str).map(html.escape)
+    venues["popup"] = ("<b>" + venue_names + "</b><br>" + venues["address"].astype(str).map(html.escape)
+                       + "<ul style='padding-left: 16px;'>" + venues["lines"] + "</ul>")
+    venues["tooltip"] = venue_names + " (" + venues["count"].astype(str) + " events)"
+    # float32 coordinates are widened back for the JSON marker data
+    venues[["lat", "lng"]] = venues[["lat", "lng"]].astype("float64").round(6)
+    return tuple(venues[["lat", "lng", "popup", "tooltip"]].itertuples(index=False, name=None))
+
+
+# Function to render a clustered map of marker rows to a standalone HTML document
+@metrics.timed("render")
+def cluster_map_html(center, points, zoom_start=12):
+    # folium takes about half a second to import; pages that only build points skip it
+    import folium
+    from folium.plugins import FastMarkerCluster
+
+    cluster_map = folium.Map(location=list(center), zoom_start=zoom_start)
+    if points:
+        FastMarkerCluster([list(point) for point in points], callback=MARKER_CALLBACK).add_to(cluster_map)
+    return cluster_map.get_root().render()
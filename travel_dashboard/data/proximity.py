@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+
+from travel_dashboard import metrics
+
+# Spatial join between the hotels table (hotel_table.py) and the events table
+# (event_table.py): for every hotel, the events within walking distance and the walking
+# distance to all of them. Events sharing a venue are collapsed into one weighted point
+# first, since a city's events take place at far fewer venues than there are events.
+#
+# Venues are bucketed into a grid of square cells one radius wide, so every venue within
+# the radius of a hotel lies in the hotel's cell or one of its eight neighbours. Cells are
+# looked up for all hotels at once with binary searches over the sorted cell keys, and
+# the exact great-circle distance is computed only for the candidate pairs, as numpy
+# arrays without a Python loop over hotels or venues. The grid uses an equirectangular
+# projection whose east-west scale is taken at the latitude farthest from the equator,
+# where degrees of longitude are shortest, so cells are never narrower than the radius.
+# Longitudes are not wrapped around the antimeridian; a city search never spans it.
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = EARTH_RADIUS_KM * np.pi / 180
+DEFAULT_RADIUS_KM = 1.0
+
+# Rankings offered on the Hotels page
+RANK_BY_NEARBY = "nearby"      # most events within the radius, then the shortest walk to them
+RANK_BY_DISTANCE = "distance"  # shortest total distance to all events
+
+RANK_COLUMNS = ["events_nearby", "nearby_km", "total_km", "rank"]
+
+# Rows of the hotel x venue distance matrix computed at once for the total distance
+DISTANCE_BLOCK_ROWS = 64
+
+
+# Points on the unit sphere; the chord between two of them gives their haversine distance
+def _unit_vectors(lat, lng):
+    lat, lng = np.radians(lat), np.radians(lng)
+    return np.column_stack([np.cos(lat) * np.cos(lng), np.cos(lat) * np.sin(lng), np.sin(lat)])
+
+
+# Function to collapse the events table into venues: coordinates and number of events
+def event_venues(events):
+    located = events[events["lat"].notna() & events["lng"].notna()]
+    venues = located.groupby([located["lat"].astype(np.float64), located["lng"].astype(np.float64)],
+                             sort=False).size()
+    return (venues.index.get_level_values(0).to_numpy(), venues.index.get_level_values(1).to_numpy(),
+            venues.to_numpy(dtype=np.float64))
+
+
+class VenueGrid:
+    def __init__(self, lat, lng, cell_km, max_abs_lat):
+        self.lat, self.lng = lat, lng
+        self._cell_km = cell_km
+        self._lng_scale = KM_PER_DEGREE * max(np.cos(np.radians(min(max_abs_lat, 89.0))), 0.01)
+        keys = self._cell_keys(*self._cells(lat, lng))
+        self._order = np.argsort(keys, kind="stable")
+        self._keys = keys[self._order]
+
+    def _cells(self, lat, lng):
+        return (np.floor(lat * KM_PER_DEGREE / self._cell_km).astype(np.int64),
+                np.floor(lng * self._lng_scale / self._cell_km).astype(np.int64))
+
+    @staticmethod
+    def _cell_keys(rows, columns):
+        return (rows << 32) + columns
+
+    # Function to find every (point, venue) pair in the same or a neighbouring cell.
+    # Returns the index arrays of the pairs.
+    def candidate_pairs(self, lat, lng):
+        rows, columns = self._cells(lat, lng)
+        points, starts, counts = [], [], []
+        for row_offset in (-1, 0, 1):
+            for column_offset in (-1, 0, 1):
+                keys = self._cell_keys(rows + row_offset, columns + column_offset)
+                lo = np.searchsorted(self._keys, keys, side="left")
+                hi = np.searchsorted(self._keys, keys, side="right")
+                points.append(np.arange(len(keys)))
+                starts.append(lo)
+                counts.append(hi - lo)
+        points, starts, counts = np.concatenate(points), np.concatenate(starts), np.concatenate(counts)
+
+        # Expand every (point, run of sorted venues) into one pair per venue
+        total = int(counts.sum())
+        run_starts = np.repeat(np.cumsum(counts) - counts, counts)
+        sorted_venues = np.repeat(starts, counts) + np.arange(total) - run_starts
+        return np.repeat(points, counts), self._order[sorted_venues]
+
+
+# Function to sum the distances from every point to all venues, weighted by their events.
+# Distances come from the chord between unit vectors, which the haversine formula is a
+# form of (hav = chord² / 4), so each block of the distance matrix is one matrix product.
+def total_distance_km(lat, lng, venue_lat, venue_lng, weights):
+    totals = np.empty(len(lat))
+    venues = _unit_vectors(venue_lat, venue_lng).T
+    points = _unit_vectors(lat, lng)
+    for block in range(0, len(points), DISTANCE_BLOCK_ROWS):
+        # In place: chord = sqrt(2 - 2 cos), angle = 2 asin(chord / 2)
+        distances = points[block:block + DISTANCE_BLOCK_ROWS] @ venues
+        distances *= -2.0
+        distances += 2.0
+        np.clip(distances, 0.0, 4.0, out=distances)
+        np.sqrt(distances, out=distances)
+        distances *= 0.5
+        np.arcsin(distances, out=distances)
+        totals[block:block + DISTANCE_BLOCK_ROWS] = distances @ weights
+    return totals * 2 * EARTH_RADIUS_KM
+
+
+# Function to find the (point, venue) pairs within radius_km among the grid's candidate
+# pairs. Returns the index arrays of the pairs and their distances. The haversine term is
+# compared with that of the radius before the arcsin, which only the matches pay for.
+def pairs_within(grid, lat, lng, radius_km):
+    points, venues = grid.candidate_pairs(lat, lng)
+    lat, lng = np.radians(lat), np.radians(lng)
+    venue_lat, venue_lng = np.radians(grid.lat), np.radians(grid.lng)
+    hav = np.sin((venue_lat[venues] - lat[points]) / 2) ** 2
+    hav += (np.cos(lat)[points] * np.cos(venue_lat)[venues]
+            * np.sin((venue_lng[venues] - lng[points]) / 2) ** 2)
+    within = hav <= np.sin(radius_km / EARTH_RADIUS_KM / 2) ** 2
+    distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(hav[within]))
+    return points[within], venues[within], distances
+
+
+# Function to rank the hotels table by the events table around every hotel. Returns a
+# frame aligned with the hotels: events within radius_km, the total distance to those
+# events, the total distance to all events, and the rank (1 is best). Hotels without
+# coordinates rank last.
+@metrics.timed("transform")
+def rank_hotels(hotels, events, radius_km=DEFAULT_RADIUS_KM, by=RANK_BY_NEARBY):
+    ranking = pd.DataFrame({"events_nearby": 0, "nearby_km": 0.0, "total_km": np.nan}, index=hotels.index)
+    venue_lat, venue_lng, weights = event_venues(events)
+    located = (hotels["lat"].notna() & hotels["lng"].notna()).to_numpy()
+    lat = hotels["lat"].to_numpy(dtype=np.float64)[located]
+    lng = hotels["lng"].to_numpy(dtype=np.float64)[located]
+
+    if len(lat) and len(venue_lat):
+        max_abs_lat = max(np.abs(lat).max(), np.abs(venue_lat).max())
+        grid = VenueGrid(venue_lat, venue_lng, radius_km, max_abs_lat)
+        points, venues, distances = pairs_within(grid, lat, lng, radius_km)
+        ranking.loc[located, "events_nearby"] = np.bincount(points, weights=weights[venues],
+                                                            minlength=len(lat)).astype(np.int64)
+        ranking.loc[located, "nearby_km"] = np.bincount(points, weights=distances * weights[venues],
+                                                        minlength=len(lat))
+        if by == RANK_BY_DISTANCE:
+            ranking.loc[located, "total_km"] = total_distance_km(lat, lng, venue_lat, venue_lng, weights)
+
+    # np.lexsort sorts by its last key first
+    if by == RANK_BY_DISTANCE:
+        order = np.lexsort([ranking["total_km"].fillna(np.inf).to_numpy(), ~located])
+    else:
+        # Among hotels with as many events nearby, the shorter average walk wins
+        average_km = ranking["nearby_km"] / ranking["events_nearby"].where(ranking["events_nearby"] > 0)
+        order = np.lexsort([average_km.fillna(np.inf).to_numpy(), -ranking["events_nearby"].to_numpy(), ~located])
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(1, len(order) + 1)
+    ranking["rank"] = rank
+    return ranking[RANK_COLUMNS]
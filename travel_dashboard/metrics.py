@@ -0,0 +1,270 @@
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Lightweight timing layer for the dashboard. API, transform and render functions are
+# wrapped with @timed, and http_client/response_cache report every upstream request and
+# cache lookup. Each measurement goes to two places:
+#   - the trace of the current rerun (a context variable, carried into worker threads
+#     with propagate()), which the sidebar performance panel shows, and
+#   - process-wide counters and histograms, exported in Prometheus text format on
+#     TRAVEL_DASHBOARD_METRICS_PORT and/or appended as JSON lines to
+#     TRAVEL_DASHBOARD_METRICS_JSONL every METRICS_EXPORT_INTERVAL seconds.
+
+METRICS_PORT = os.environ.get("TRAVEL_DASHBOARD_METRICS_PORT")
+METRICS_JSONL = os.environ.get("TRAVEL_DASHBOARD_METRICS_JSONL")
+METRICS_EXPORT_INTERVAL = float(os.environ.get("TRAVEL_DASHBOARD_METRICS_INTERVAL", 60))
+METRIC_PREFIX = "travel_dashboard_"
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# start is seconds since the rerun started; status and size are None when not known
+Span = namedtuple("Span", ["kind", "name", "start", "seconds", "status", "size", "thread"])
+
+METRIC_HELP = {
+    "call_seconds": ("histogram", "Duration of instrumented API, transform and render functions"),
+    "upstream_requests_total": ("counter", "Upstream HTTP requests by API and status"),
+    "upstream_request_seconds": ("histogram", "Upstream HTTP request duration"),
+    "upstream_response_bytes_total": ("counter", "Bytes received from upstream APIs"),
+    "cache_lookups_total": ("counter", "Response cache lookups by API and result (coalesced: upstream calls saved "
+                                       "by waiting for an identical request in flight)"),
+    "rerun_seconds": ("histogram", "Duration of a full script rerun by page"),
+    "warmer_refreshes_total": ("counter", "Cache warmer refreshes by kind and result"),
+    "rate_limit_wait_seconds": ("histogram", "Time upstream requests spent queued for a rate limit token"),
+    "rate_limit_rejections_total": ("counter", "Upstream requests refused by the rate limiter by API, priority "
+                                               "and reason (wait: estimated wait too long, quota: daily quota used up)"),
+    "rate_limit_tokens": ("gauge", "Tokens left in the rate limit bucket of an API"),
+    "rate_limit_quota_used": ("gauge", "Upstream requests counted against the daily quota of an API"),
+    "rate_limit_waiting": ("gauge", "Upstream requests queued for a rate limit token by API and priority"),
+}
+
+
+class Registry:
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self._counters = {}  # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> [bucket counts..., +Inf count, sum]
+        self._collectors = []  # functions returning the current gauges as (name, labels, value)
+        self._lock = threading.Lock()
+
+    def inc(self, name, labels, value=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram[index] += 1
+            histogram[-2] += 1
+            histogram[-1] += value
+
+    # Function to register a gauge source, read on every snapshot
+    def add_collector(self, collect):
+        with self._lock:
+            self._collectors.append(collect)
+
+    def snapshot(self):
+        with self._lock:
+            collectors = list(self._collectors)
+            counters = [{"name": name, "labels": dict(labels), "value": value}
+                        for (name, labels), value in sorted(self._counters.items())]
+            histograms = [{"name": name, "labels": dict(labels), "count": values[-2], "sum": round(values[-1], 6),
+                           "buckets": dict(zip(map(str, self.buckets), values[:-2]))}
+                          for (name, labels), values in sorted(self._histograms.items())]
+        gauges = sorted(({"name": name, "labels": dict(labels), "value": value}
+                         for collect in collectors for name, labels, value in collect()), key=lambda gauge: gauge["name"])
+        return {"counters": counters, "histograms": histograms, "gauges": gauges}
+
+    # Function to render every metric in the Prometheus text exposition format
+    def prometheus_text(self):
+        snapshot = self.snapshot()
+        lines = []
+        described = set()
+
+        def describe(name):
+            if name not in described:
+                described.add(name)
+                metric_type, help_text = METRIC_HELP.get(name, ("untyped", name))
+                lines.append(f"# HELP {METRIC_PREFIX}{name} {help_text}")
+                lines.append(f"# TYPE {METRIC_PREFIX}{name} {metric_type}")
+
+        for counter in snapshot["counters"]:
+            describe(counter["name"])
+            lines.append(f"{METRIC_PREFIX}{counter['name']}{_labels(counter['labels'])} {counter['value']}")
+        for gauge in snapshot["gauges"]:
+            describe(gauge["name"])
+            lines.append(f"{METRIC_PREFIX}{gauge['name']}{_labels(gauge['labels'])} {gauge['value']}")
+        for histogram in snapshot["histograms"]:
+            describe(histogram["name"])
+            name, labels = f"{METRIC_PREFIX}{histogram['name']}", histogram["labels"]
+            for bound, count in histogram["buckets"].items():
+                lines.append(f"{name}_bucket{_labels({**labels, 'le': bound})} {count}")
+            lines.append(f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {histogram['count']}")
+            lines.append(f"{name}_sum{_labels(labels)} {histogram['sum']}")
+            lines.append(f"{name}_count{_labels(labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class Trace:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, kind, name, started, seconds, status=None, size=None):
+        span = Span(kind, name, started - self.started, seconds, status, size, threading.current_thread().name)
+        with self._lock:
+            self.spans.append(span)
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+registry = Registry()
+_current_trace = contextvars.ContextVar("travel_dashboard_trace", default=None)
+
+
+# Function to start the trace of a new rerun in the calling thread
+def start_trace():
+    trace = Trace()
+    _current_trace.set(trace)
+    return trace
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+# Function to record the total duration of a finished rerun
+def finish_trace(trace, page):
+    registry.observe("rerun_seconds", {"page": page}, trace.elapsed())
+
+
+# Wraps fn so that it runs with the caller's context variables (its trace, and whether
+# its requests are background work) when run on a worker thread. Every call gets its
+# own copy, so the wrapper can run on several threads at once.
+def propagate(fn):
+    context = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+    return run
+
+
+# Decorator timing every call of a function under the given kind ("api", "transform",
+# "render", ...). Exceptions are recorded with status "error" and re-raised.
+def timed(kind, name=None):
+    def decorate(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            status = "ok"
+            try:
+                return fn(*args, **kwargs)
+            except BaseException:
+                status = "error"
+                raise
+            finally:
+                seconds = time.perf_counter() - started
+                registry.observe("call_seconds", {"kind": kind, "name": label}, seconds)
+                trace = _current_trace.get()
+                if trace is not None:
+                    trace.add(kind, label, started, seconds, status)
+        return wrapper
+    return decorate
+
+
+# Function to record one upstream HTTP request; status is None for connection errors
+def record_request(api, started, status, size):
+    seconds = time.perf_counter() - started
+    status = str(status) if status else "error"
+    registry.inc("upstream_requests_total", {"api": api, "status": status})
+    registry.observe("upstream_request_seconds", {"api": api}, seconds)
+    if size:
+        registry.inc("upstream_response_bytes_total", {"api": api}, size)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add("http", api, started, seconds, status, size)
+
+
+# Function to record the time a request spent queued for a rate limit token
+def record_queue(api, priority, started, seconds):
+    registry.observe("rate_limit_wait_seconds", {"api": api, "priority": priority}, seconds)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add("queue", api, started, seconds, priority)
+
+
+# Function to record a response cache lookup: result is "hit", "stale", "miss" or
+# "coalesced" (a miss that waited for the same request of another caller)
+def record_cache(api, result):
+    registry.inc("cache_lookups_total", {"api": api, "result": result})
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add("cache", api, time.perf_counter(), 0.0, result)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = registry.prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _write_jsonl_forever(path, interval):
+    while True:
+        time.sleep(interval)
+        line = json.dumps({"timestamp": time.time(), "pid": os.getpid(), **registry.snapshot()})
+        with open(path, "a") as jsonl_file:
+            jsonl_file.write(line + "\n")
+
+
+_exporters_started = False
+_exporters_lock = threading.Lock()
+
+
+# Function to start the configured exporters once per process
+def start_exporters():
+    global _exporters_started
+    with _exporters_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+        if METRICS_PORT:
+            server = ThreadingHTTPServer(("0.0.0.0", int(METRICS_PORT)), _MetricsHandler)
+            threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        if METRICS_JSONL:
+            threading.Thread(target=_write_jsonl_forever, args=(METRICS_JSONL, METRICS_EXPORT_INTERVAL),
+                             name="metrics-jsonl", daemon=True).start()
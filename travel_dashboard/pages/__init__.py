@@ -0,0 +1,16 @@
+import importlib
+
+# Sidebar label -> page module. A page module is imported the first time its page is
+# opened, so its libraries (plotly, folium, ...) are not loaded by the other pages.
+PAGES = {
+    "🏠 Home - Overview": "home",
+    "✈️ Flights - Book Your Travel": "flights",
+    "🏨 Hotels - Find Accommodations": "hotels",
+    "🎉 Events - Find Local Happenings": "events",
+    "🌦️ Weather Forecast - Check Weather": "weather",
+}
+
+
+# Function to draw the selected page
+def render(page):
+    importlib.import_module(f"{__name__}.{PAGES[page]}").render()
@@ -0,0 +1,19 @@
+import streamlit as st
+import streamlit.components.v1 as components
+
+from travel_dashboard import metrics
+from travel_dashboard.data import maps
+
+# Clustered maps of the hotels and events pages. folium is only imported when a map is
+# actually drawn, so opening either page before a search does not load it.
+
+
+# Map HTML is cached per result set, so reruns and tab switches reuse the rendered map
+@st.cache_data(max_entries=32)
+def render_cluster_map(center, points):
+    return maps.cluster_map_html(center, points)
+
+
+@metrics.timed("render")
+def show_cluster_map(center, points):
+    components.html(render_cluster_map(center, points), width=700, height=500)
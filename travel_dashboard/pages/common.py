@@ -0,0 +1,81 @@
+import math
+import os
+
+import streamlit as st
+
+from travel_dashboard import metrics
+from travel_dashboard.api import rate_limit
+from travel_dashboard.api.usage import get_usage_store
+from travel_dashboard.data.city_index import CityIndex
+from travel_dashboard.data.forecast import forecast_frames
+
+# Helpers shared by several pages.
+
+CITIES_CSV = "worldcities.csv"
+CITY_SEARCH_RESULTS = 8
+API_NAMES = {"amadeus": "Amadeus", "ticketmaster": "Ticketmaster", "openweather": "OpenWeather",
+             "google_places": "Google Places"}
+
+
+# Load the city index once per process; a new CSV mtime builds a fresh one
+@st.cache_resource(max_entries=1)
+def load_city_index(csv_mtime):
+    return CityIndex.load(CITIES_CSV)
+
+
+def get_city_index():
+    return load_city_index(os.path.getmtime(CITIES_CSV))
+
+
+# Typeahead city picker. The query is matched on the server against the shared city
+# index and only the top matches by population are sent to the browser.
+def city_search_box(label, key, default=None):
+    city_index = get_city_index()
+    query = st.text_input(label, value=default or "", key=f"{key}_query",
+                          placeholder="Start typing a city name")
+    rows = city_index.search(query, k=CITY_SEARCH_RESULTS)
+    if not rows:
+        st.info("No matching city. Try another spelling.")
+        return None
+    row = st.radio("Matching cities", rows, format_func=city_index.label, key=f"{key}_match",
+                   label_visibility="collapsed", horizontal=True)
+    return city_index.record(row)
+
+
+# Function to count a city lookup for the cache warmer's popularity ranking, once per
+# session and city so reruns of the same page are not counted again
+def track_city(city):
+    tracked = st.session_state.setdefault("tracked_cities", set())
+    if city not in tracked:
+        tracked.add(city)
+        get_usage_store().record_city(city)
+
+
+# Function to explain a request the rate limiter refused: how long to wait, or that the
+# day's quota is used up
+def rate_limit_notice(error):
+    api = API_NAMES.get(error.api, error.api)
+    if isinstance(error, rate_limit.QuotaExhausted):
+        st.warning(f"The daily {api} request quota is used up. New searches are possible again tomorrow.")
+    else:
+        st.info(f"{api} requests are queued right now (estimated wait {math.ceil(error.estimated_wait)} s). "
+                "Please try again shortly.")
+
+
+# Weather icons and recommendations
+weather_icons = {
+    "clear sky": ("☀️", "Perfect day for outdoor events! Enjoy the sunshine."),
+    "few clouds": ("🌤️", "Great weather for being outside! Slightly cloudy but enjoyable."),
+    "scattered clouds": ("⛅", "Weather is suitable for events. Expect some clouds but mostly clear."),
+    "overcast clouds": ("☁️", "Event-friendly, but keep an eye out for possible rain."),
+    "rain": ("🌧️", "Not ideal for outdoor events. Consider indoor plans or prepare for rain."),
+    "thunderstorm": ("⛈️", "Avoid outdoor events due to thunderstorms. Stay safe indoors."),
+    "broken clouds": ("⛅", "Partly cloudy with some breaks of sunshine. Great for outdoor plans!")
+}
+
+
+# Parse a forecast payload once; every weather view reads the memoized frames
+@st.cache_data(max_entries=64)
+@metrics.timed("transform")
+def load_forecast(weather_data):
+    return forecast_frames(weather_data)
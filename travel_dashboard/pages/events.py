@@ -0,0 +1,222 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import streamlit as st
+
+from travel_dashboard import metrics
+from travel_dashboard.api import openweather, rate_limit, ticketmaster
+from travel_dashboard.data import maps
+from travel_dashboard.data.event_table import build_event_table
+from travel_dashboard.pages.cluster_map import show_cluster_map
+from travel_dashboard.pages.common import (city_search_box, get_city_index, load_forecast, rate_limit_notice,
+                                           track_city, weather_icons)
+
+# Events shown while the remaining Ticketmaster pages are still loading
+EVENTS_FIRST_SCREEN = 10
+EVENTS_PREVIEW_INTERVAL = 0.5  # seconds between refreshes of the preview
+
+EVENT_CATEGORIES = {
+    "Music": "🎶 Music",
+    "Sports": "🏅 Sports",
+    "Arts & Theatre": "🎭 Arts & Theatre",
+    "Comedy": "😂 Comedy",
+    "Festivals": "🎉 Festivals",
+}
+
+
+# Fetch events from Ticketmaster API with pagination
+def get_all_events(city, start_date, end_date, categories):
+    events, failed_pages = ticketmaster.fetch_all_events(city, start_date, end_date, categories)
+    if failed_pages:
+        st.warning(f"Some event results could not be retrieved: {', '.join(failed_pages)}")
+    return events
+
+
+# Venue markers are built from the events table when the map is shown and cached for the
+# whole process, so a session keeps nothing but the table itself
+@st.cache_data(max_entries=32)
+def event_map_points(events):
+    return maps.venue_points(events)
+
+
+# Function to turn a forecast into the per-day badges shown on event cards
+def daily_weather_badges(weather_data):
+    daily_forecast = {}
+    if weather_data:
+        # Daily highs, lows and the prevailing condition from the shared forecast model
+        for day in load_forecast(weather_data).daily.itertuples(index=False):
+            daily_forecast[day.date] = {
+                'high': round(day.temp_max),
+                'low': round(day.temp_min),
+                'weather': day.description,
+                'icon': weather_icons.get(day.description, "🌥️")[0],
+                'recommendation': weather_icons.get(day.description, ("🌥️", "Check weather details"))[1]
+            }
+    return daily_forecast
+
+
+# Function to read the forecast fetched alongside an event search into badges, reporting
+# a forecast that could not be retrieved or that the rate limiter refused
+def forecast_badges(weather_future):
+    try:
+        weather_data = weather_future.result()
+    except rate_limit.RateLimitError as error:
+        rate_limit_notice(error)
+        return {}
+    if weather_data is None:
+        st.warning("Weather data could not be retrieved.")
+    return daily_weather_badges(weather_data)
+
+
+def fill_weather_badge(badge, daily_forecast, event_date):
+    # Get the weather forecast for the event's date
+    weather_info = daily_forecast.get(event_date, {})
+    weather_icon = weather_info.get('icon', "🌥️")
+    recommendation = weather_info.get('recommendation', "Check weather details")
+    badge.write(f"**Weather:** {weather_icon} {recommendation}")
+
+
+# Function to display one event card from a row of the events table. Returns the event
+# date and the placeholder of its weather badge, which shows a loading note until the
+# forecast is known.
+def display_event(event, daily_forecast=None):
+    event_name = event.name
+    event_date = str(event.date)
+    venue_name = event.venue
+    venue_address = event.address
+    event_url = event.url
+    event_image = event.image
+
+    # Display event details with weather recommendations
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        if event_image:
+            st.image(event_image, use_container_width=True, caption=event_name)
+        else:
+            st.write("No image available")
+
+    with col2:
+        st.subheader(event_name)
+        st.write(f"**Date:** {event_date}")
+        st.write(f"**Venue:** {venue_name}")
+        st.write(f"**Address:** {venue_address}")  # Show address
+        st.write(f"[More Details]({event_url})")
+        badge = st.empty()
+        if daily_forecast is None:
+            badge.write("**Weather:** ⏳ Loading forecast...")
+        else:
+            fill_weather_badge(badge, daily_forecast, event_date)
+    st.markdown("---")
+    return event_date, badge
+
+
+# Function to stream the events of a search onto the page as Ticketmaster pages arrive.
+# Events and the forecast are looked up around the City record's coordinates, since
+# names such as Paris are ambiguous; its name is only shown.
+def search_events(city, start_date, end_date, categories):
+    track_city(city.name)
+    near = (city.lat, city.lng)
+    search_started = time.perf_counter()
+    status = st.empty()
+    results = st.empty()
+    events_by_id = {}
+    failed_pages = []
+    daily_forecast = None
+    time_to_first_result = None
+    last_preview = 0.0
+
+    # The forecast is fetched alongside the events; badges fill in when it arrives
+    with ThreadPoolExecutor(max_workers=1) as weather_executor:
+        weather_future = weather_executor.submit(metrics.propagate(openweather.fetch_weather_data), city.name,
+                                                 near=near)
+
+        with st.spinner(f"Searching for events in {city.name}..."):
+            for page_events, failed_page in ticketmaster.iter_event_pages(city.name, start_date, end_date, categories,
+                                                                          near=near):
+                if failed_page:
+                    failed_pages.append(failed_page)
+                ticketmaster.merge_events(events_by_id, page_events)
+                if daily_forecast is None and weather_future.done():
+                    daily_forecast = forecast_badges(weather_future)
+
+                # Show the first screenful as soon as anything arrives, then refresh it
+                now = time.perf_counter()
+                if events_by_id and (time_to_first_result is None or now - last_preview > EVENTS_PREVIEW_INTERVAL):
+                    preview = build_event_table(ticketmaster.sort_events(events_by_id.values())[:EVENTS_FIRST_SCREEN])
+                    with results.container():
+                        for event in preview.itertuples(index=False):
+                            display_event(event, daily_forecast)
+                    if time_to_first_result is None:
+                        time_to_first_result = time.perf_counter() - search_started
+                    last_preview = now
+                    status.caption(f"Loaded {len(events_by_id)} events so far...")
+
+        # Only the compact table outlives the search; the raw events are dropped here
+        events = build_event_table(ticketmaster.sort_events(events_by_id.values()))
+        del events_by_id
+        st.session_state.events_table = events
+        st.session_state.events_city = city
+
+        if failed_pages:
+            st.warning(f"Some event results could not be retrieved: {', '.join(failed_pages)}")
+
+        if not events.empty:
+            with results.container():
+                badges = [display_event(event, daily_forecast) for event in events.itertuples(index=False)]
+        else:
+            results.empty()
+            st.warning("No events found for the selected criteria.")
+        time_to_complete = time.perf_counter() - search_started
+
+        if daily_forecast is None:
+            daily_forecast = forecast_badges(weather_future)
+            for event_date, badge in (badges if not events.empty else []):
+                fill_weather_badge(badge, daily_forecast, event_date)
+
+    st.session_state.events_timing = {"first_result": time_to_first_result, "complete": time_to_complete}
+    if not events.empty:
+        status.caption(f"First results after {time_to_first_result:.1f} s, "
+                       f"all {len(events)} events after {time_to_complete:.1f} s")
+    else:
+        status.empty()
+
+
+def render():
+    st.title("🎉 Events - Find Local Happenings")
+
+    # Create tabs for event search/details and map view
+    tab1, tab2 = st.tabs(["Search & Details", "Event Map"])
+
+    # Tab 1: Event Search & Details
+    with tab1:
+        st.subheader("Search for Events")
+
+        selected_city = city_search_box("Search for a City for Events:", key="events_city",
+                                        default=get_city_index().default_city)
+        if selected_city is not None:
+            start_date = st.date_input("Event Start Date", datetime.now(), key="event_start_date")
+            end_date = st.date_input("Event End Date", datetime.now() + timedelta(days=7), key="event_end_date")
+
+            if start_date > end_date:
+                st.error("Start date cannot be after end date. Please select a valid start date.")
+
+            st.write("Choose event categories you are interested in:")
+            selected_categories = [category for category, label in EVENT_CATEGORIES.items() if st.checkbox(label)]
+
+            if st.button("Search Events"):
+                if selected_categories:
+                    search_events(selected_city, start_date, end_date, selected_categories)
+                else:
+                    st.warning("Please select at least one event category.")
+
+    # Tab 2: Event Map
+    with tab2:
+        st.subheader("Event Map")
+        events = st.session_state.get("events_table")
+        if events is not None and not events.empty:
+            # One clustered marker per venue, listing all of its events, around the searched city
+            events_city = st.session_state.events_city
+            show_cluster_map((events_city.lat, events_city.lng), event_map_points(events))
+        else:
+            st.write("No events found. Please search for events in the 'Search & Details' tab.")
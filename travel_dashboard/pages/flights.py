@@ -0,0 +1,274 @@
+import html
+import time
+
+import pandas as pd
+import plotly.express as px
+import requests
+import streamlit as st
+
+from travel_dashboard import metrics
+from travel_dashboard.api import amadeus, rate_limit
+from travel_dashboard.data import flight_offers
+from travel_dashboard.pages.common import rate_limit_notice
+
+CALENDAR_REFRESH_INTERVAL = 0.5  # seconds between heatmap redraws while cells arrive
+
+
+# Function to retrieve Amadeus token
+def get_amadeus_token():
+    try:
+        return amadeus.get_token_provider().get_token()
+    except rate_limit.RateLimitError as error:
+        rate_limit_notice(error)
+    except requests.exceptions.HTTPError as error:
+        st.write("Failed to retrieve Amadeus token:", error.response.text)
+    except (requests.exceptions.RequestException, KeyError, ValueError) as error:
+        st.write("Failed to retrieve Amadeus token:", str(error))
+    return None
+
+
+# Function to search for flights, reporting failures on the page
+def get_flights(token, origin, destination, departure_date, return_date, num_passengers, travel_class, trip_type):
+    try:
+        return amadeus.search_flights(token, origin, destination, departure_date, return_date, num_passengers,
+                                      travel_class, trip_type)
+    except rate_limit.RateLimitError as error:
+        rate_limit_notice(error)
+    except requests.exceptions.JSONDecodeError as error:
+        st.write("Failed to retrieve flight data. Non-JSON response received.")
+        st.write("Response content:", error.doc)
+    except requests.exceptions.HTTPError as error:
+        st.write("Failed to retrieve flight data. Status code:", error.response.status_code)
+        st.write("Response content:", error.response.text)
+    except requests.exceptions.RequestException as error:
+        st.write("Failed to retrieve flight data:", str(error))
+    return [], {}
+
+
+@metrics.timed("render")
+def plot_price_calendar(calendar):
+    one_way = list(calendar.columns) == ["One-way"]
+    fig = px.imshow(
+        calendar.T if one_way else calendar,
+        x=[str(day) for day in calendar.index] if one_way else [str(day) for day in calendar.columns],
+        y=["One-way"] if one_way else [str(day) for day in calendar.index],
+        text_auto=".0f", aspect="auto", color_continuous_scale="RdYlGn_r",
+        labels={"x": "Departure Date" if one_way else "Return Date", "y": "" if one_way else "Departure Date",
+                "color": "Cheapest (USD)"},
+        title="Cheapest Fare by Date",
+    )
+    st.plotly_chart(fig)
+
+
+# Function to format a duration in minutes
+def format_duration(minutes):
+    hours, minutes = divmod(int(minutes), 60)
+    return f"{hours} hours {minutes} minutes"
+
+
+# Rendering budget for the flight results: whatever the number of offers, one rerun
+# draws the page controls, one HTML table for the current page of offers and, only when
+# a flight is picked, one segment table for it. That keeps the results view at about
+# ten Streamlit elements instead of ~20 elements per offer.
+FLIGHTS_PER_PAGE = 20
+
+
+# Function to build one compact HTML table for a page of offers
+def flight_table_html(offers, first_number):
+    stops = offers["stops_out"].astype(str)
+    stops = stops.where(offers["stops_in"] < 0, stops + " / " + offers["stops_in"].astype(str))
+    cells = pd.DataFrame({
+        "#": range(first_number, first_number + len(offers)),
+        "Route": offers["route_out"] + offers["route_in"].map(lambda route: f" / {route}" if route else ""),
+        "Airline": offers["carrier_name"].astype(str).map(html.escape),
+        "Departure": offers["departure"].dt.strftime("%b %d, %I:%M %p"),
+        "Arrival": offers["arrival"].dt.strftime("%b %d, %I:%M %p"),
+        "Duration": (offers["duration_min"] // 60).astype(str) + "h " + (offers["duration_min"] % 60).astype(str) + "m",
+        "Stops": stops,
+        "Price": offers["currency"].astype(str) + " " + offers["price"].map("{:,.2f}".format),
+    })
+    header = "".join(f"<th style='text-align: left; padding: 4px 8px;'>{column}</th>" for column in cells.columns)
+    rows = "".join(
+        "<tr>" + "".join(f"<td style='padding: 4px 8px;'>{value}</td>" for value in row) + "</tr>"
+        for row in cells.itertuples(index=False)
+    )
+    return f"<table style='width: 100%; border-collapse: collapse;'><tr>{header}</tr>{rows}</table>"
+
+
+@metrics.timed("render")
+def display_flights(table):
+    offers = table.offers
+    page_count = max(1, -(-len(offers) // FLIGHTS_PER_PAGE))
+
+    # Page controls
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        page_number = st.number_input("Page", min_value=1, max_value=page_count, value=1)
+    start = (page_number - 1) * FLIGHTS_PER_PAGE
+    page = offers.iloc[start:start + FLIGHTS_PER_PAGE]
+    with col2:
+        st.caption(f"Showing flights {start + 1}-{start + len(page)} of {len(offers)} (page {page_number} of {page_count})")
+
+    st.markdown(flight_table_html(page, start + 1), unsafe_allow_html=True)
+
+    # Segment details are only rendered for the flight the user asks for
+    numbers = list(range(start + 1, start + len(page) + 1))
+    selected = st.selectbox("Flight Details", [None] + numbers,
+                            format_func=lambda number: "Select a flight to see its segments" if number is None
+                            else f"Flight {number}: {page['route_out'].iloc[number - start - 1]}")
+    if selected is not None:
+        offer = page.iloc[selected - start - 1]
+        display_itinerary(table.segments[table.segments["offer"] == offer["offer"]])
+
+
+@metrics.timed("render")
+def display_itinerary(segments):
+    leg_durations = segments.groupby("leg")["duration_min"].sum()
+    st.write(" | ".join(f"**{'Outbound' if leg == 0 else 'Inbound'} Flight Time:** {format_duration(minutes)}"
+                        for leg, minutes in leg_durations.items()))
+    st.dataframe(pd.DataFrame({
+        "Leg": segments["leg"].map({0: "Outbound", 1: "Inbound"}),
+        "Airline": segments["carrier_name"].astype(str) + " (" + segments["carrier"].astype(str) + segments["number"] + ")",
+        "Aircraft": segments["aircraft_name"].astype(str) + " (" + segments["aircraft"] + ")",
+        "Route": segments["origin"] + " - " + segments["destination"],
+        "Departure": segments["departure"].dt.strftime("%b %d, %Y - %I:%M %p"),
+        "Arrival": segments["arrival"].dt.strftime("%b %d, %Y - %I:%M %p"),
+        "Flight Duration": segments["duration_min"].map(format_duration),
+    }), hide_index=True)
+
+
+@metrics.timed("render")
+def plot_flight_prices(table):
+    # Calculate the mean price for each airline
+    df_mean = flight_offers.mean_price_by_carrier(table.offers).rename(
+        columns={"carrier_name": "Airline", "price": "Price (USD)"})
+
+    # Plot the bar chart
+    fig = px.bar(df_mean, x="Airline", y="Price (USD)", color="Airline",
+                 title="Average Flight Prices by Airline",
+                 labels={"Price (USD)": "Average Price in USD"})
+
+    fig.update_layout(xaxis_title="Airline", yaxis_title="Average Price (USD)",
+                      xaxis_tickangle=-45)
+
+    st.plotly_chart(fig)
+
+
+# Function to show the flexible-date calendar of a search, filling in missing cells
+# one by one when the search was just run. Cells already known are never re-fetched.
+def display_price_calendar(calendar_key, fetch_missing):
+    (origin, destination, departure_date, return_date, num_passengers, travel_class, trip_type), flex_days = calendar_key
+    stored = st.session_state.get("flight_calendar")
+    if stored is None or stored["key"] != calendar_key:
+        if not fetch_missing:
+            return
+        pairs = flight_offers.flexible_date_pairs(departure_date, return_date if trip_type == "Round-Trip" else None,
+                                                  flex_days)
+        stored = {"key": calendar_key, "pairs": pairs, "calendar": flight_offers.empty_price_calendar(pairs),
+                  "done": set()}
+        st.session_state.flight_calendar = stored
+    calendar, done = stored["calendar"], stored["done"]
+
+    slot = st.empty()
+    missing = [pair for pair in stored["pairs"] if pair not in done]
+    if fetch_missing and missing:
+        token = get_amadeus_token()
+        if not token:
+            return
+        failed = 0
+        last_redraw = 0.0
+        for departure, back, price, cell_failed in amadeus.iter_price_calendar(token, origin, destination, missing,
+                                                                                num_passengers, travel_class):
+            if cell_failed:
+                failed += 1
+                continue
+            done.add((departure, back))
+            if price is not None:
+                flight_offers.set_calendar_price(calendar, departure, back, price)
+            if time.perf_counter() - last_redraw > CALENDAR_REFRESH_INTERVAL:
+                with slot.container():
+                    plot_price_calendar(calendar)
+                last_redraw = time.perf_counter()
+        if failed:
+            st.caption(f"{failed} dates could not be priced and will be retried on the next search.")
+    with slot.container():
+        plot_price_calendar(calendar)
+
+
+def render():
+    st.title("✈️ Flights - Book Your Travel")
+    st.subheader("Flight Search")
+    origin = st.text_input("Departure Airport Code", "JFK")
+    destination = st.text_input("Destination Airport Code", "LAX")
+    trip_type = st.radio("Trip Type", ["One-Way", "Round-Trip"], key="trip_type")
+    departure_date = st.date_input("Departure Date")
+    return_date = st.date_input("Return Date") if trip_type == "Round-Trip" else None
+
+    if trip_type == "Round-Trip" and return_date < departure_date:
+        st.error("Return date cannot be before the departure date. Please select a valid return date.")
+
+    travel_class = st.selectbox("Travel Class", ["ECONOMY", "BUSINESS", "FIRST"])
+    num_passengers = st.number_input("Number of Passengers", min_value=1, max_value=10, value=1)
+    flexible_days = st.slider("Flexible Dates (± days)", 0, 3, 0,
+                              help="Also compare the cheapest fare of nearby departure and return dates")
+
+    # Results are kept per search key; changing a filter below never re-queries Amadeus
+    search_key = (origin.strip().upper(), destination.strip().upper(), departure_date, return_date,
+                  num_passengers, travel_class, trip_type)
+    calendar_key = (search_key, flexible_days)
+    calendar_requested = False
+    if st.button("Search Flights"):
+        calendar_requested = flexible_days > 0
+        previous = st.session_state.get("flight_search")
+        if previous is None or previous["key"] != search_key or previous["table"].offers.empty:
+            with st.spinner("Searching for flights..."):
+                token = get_amadeus_token()
+                if token:
+                    flights, dictionaries = get_flights(token, *search_key)
+                    st.session_state.flight_search = {
+                        "key": search_key,
+                        "table": flight_offers.flatten_offers(flights, dictionaries),
+                    }
+                else:
+                    st.warning("Authorization failed. Please check your API credentials.")
+
+    flight_search = st.session_state.get("flight_search")
+    if flight_search is None:
+        return
+    table = flight_search["table"]
+    if flight_search["key"] != search_key:
+        st.info("Showing results of your previous search. Press Search Flights to update them.")
+
+    if table.offers.empty:
+        st.warning("No flights found for the selected route.")
+        return
+    st.write("### Flight Results")
+
+    # Refine the stored results
+    col1, col2 = st.columns(2)
+    with col1:
+        max_stops = st.selectbox("Number of Stops", flight_offers.STOP_OPTIONS, index=0)
+        carriers = st.multiselect("Airlines", sorted(table.offers["carrier_name"].unique()))
+        sort_by = st.selectbox("Sort By", list(flight_offers.SORT_OPTIONS))
+    with col2:
+        min_price, max_price = float(table.offers["price"].min()), float(table.offers["price"].max())
+        price_range = st.slider("Price Range (USD)", min_price, max(max_price, min_price + 1),
+                                (min_price, max(max_price, min_price + 1)))
+        departure_hours = st.slider("Departure Window (hour)", 0, 24, (0, 24))
+        best_only = st.checkbox("Only best price / duration trade-offs")
+
+    offers = flight_offers.filter_offers(table.offers, max_stops, price_range, carriers, departure_hours)
+    if best_only:
+        offers = flight_offers.pareto_offers(offers)
+    offers = flight_offers.sort_offers(offers, sort_by)
+
+    if offers.empty:
+        st.warning("No flights match the selected filters.")
+        return
+    refined = flight_offers.FlightTable(offers, table.segments)
+    chart_col, calendar_col = st.columns(2)
+    with chart_col:
+        plot_flight_prices(refined)
+    with calendar_col:
+        display_price_calendar(calendar_key, calendar_requested)
+    display_flights(refined)
@@ -0,0 +1,12 @@
+import streamlit as st
+
+
+def render():
+    st.title("Welcome to the Travel Dashboard!")
+    st.markdown("""
+        This dashboard allows you to explore various travel-related information for your chosen destination, including:
+        - Flight options for your travel needs
+        - Available hotels and accommodations
+        - Events in the selected city
+        - Local weather forecasts
+    """)
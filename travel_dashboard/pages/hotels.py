@@ -0,0 +1,257 @@
+import math
+import time
+from datetime import datetime, timedelta
+
+import requests
+import streamlit as st
+
+from travel_dashboard.api import places, rate_limit
+from travel_dashboard.api.credentials import get_secret
+from travel_dashboard.api.photo_cache import load_thumbnails
+from travel_dashboard.data import maps, proximity
+from travel_dashboard.data.hotel_table import build_hotel_table
+from travel_dashboard.pages.cluster_map import show_cluster_map
+from travel_dashboard.pages.common import city_search_box, get_city_index, rate_limit_notice
+
+HOTEL_MAP_REFRESH_INTERVAL = 2.0  # seconds between map redraws during a coverage search
+HOTELS_PER_PAGE = 20  # hotels listed, and thumbnails loaded, per page of results
+
+# Rankings of the hotels by the events of the last Events page search
+EVENT_RANKINGS = {
+    "Most events within walking distance": proximity.RANK_BY_NEARBY,
+    "Shortest total distance to all events": proximity.RANK_BY_DISTANCE,
+}
+
+
+# Function to get hotel data from Google Places API, reporting failures on the page
+def get_hotels(location, radius=5000):
+    try:
+        return places.fetch_hotels(get_secret("google_key"), location, radius)
+    except rate_limit.RateLimitError as error:
+        rate_limit_notice(error)
+    except requests.exceptions.HTTPError as error:
+        st.error(f"Error fetching data from Google Places API: {error.response.status_code}")
+    except (requests.exceptions.RequestException, ValueError) as error:
+        st.error(f"Error fetching data from Google Places API: {error}")
+    return []
+
+
+# Photo reference of a hotel's first photo, if it has one
+def hotel_photo_reference(hotel):
+    return hotel['photos'][0]['photo_reference'] if hotel.get('photos') else None
+
+
+# Function to load the thumbnails of a batch of hotels in parallel from the local photo
+# cache. Photo requests of a coverage search are charged to its request budget.
+def load_hotel_thumbnails(hotels, budget=None):
+    references = [reference for reference in map(hotel_photo_reference, hotels) if reference]
+    if not references:
+        return {}
+    return load_thumbnails(get_secret("google_key"), references, budget.take_photo if budget else None)
+
+
+def display_hotel(hotel, thumbnails):
+    st.write(f"**{hotel['name']}**")
+    st.write(f"Rating: {hotel.get('rating', 'N/A')} ⭐ | Address: {hotel.get('vicinity', 'N/A')}")
+    price_level = hotel.get('price_level', None)
+    if price_level:
+        price_description = "$" * price_level
+        st.write(f"Price Level: {price_description}")
+    else:
+        st.write("Price Level: N/A")
+
+    # Served from the local thumbnail cache, so the API key never reaches the browser
+    thumbnail = thumbnails.get(hotel_photo_reference(hotel))
+    if thumbnail:
+        st.image(thumbnail)
+    st.markdown("---")
+
+
+# Function to list one page of the hotels of the last search. Only the thumbnails of
+# that page are loaded, so a coverage search with a thousand results does not fetch a
+# thousand photos.
+def show_hotel_list():
+    hotels = st.session_state.get("hotel_results")
+    if not hotels:
+        return
+    pages = math.ceil(len(hotels) / HOTELS_PER_PAGE)
+    page = st.number_input(f"Page (of {pages})", 1, pages, key="hotel_page") if pages > 1 else 1
+    visible = hotels[(page - 1) * HOTELS_PER_PAGE:page * HOTELS_PER_PAGE]
+    budget = st.session_state.get("hotel_budget")
+    thumbnails = load_hotel_thumbnails(visible, budget)
+    if budget is not None and budget.photos_skipped:
+        st.caption(f"Some photos are not shown: the search's cap of {budget.max_requests} Places requests "
+                   f"was reached ({budget.used} used).")
+    for hotel in visible:
+        display_hotel(hotel, thumbnails)
+
+
+# Function to keep the hotels of a finished search for the list, starting on its first page.
+# Later photo requests of a coverage search are charged to its budget.
+def store_hotel_results(hotels, budget=None):
+    st.session_state.hotel_results = hotels
+    st.session_state.hotel_budget = budget
+    st.session_state.pop("hotel_page", None)
+
+
+# Plot the hotels of the last search on one clustered layer, as ranked markers when
+# ranked_points are given
+def show_hotel_map(slot, ranked_points=None):
+    with slot.container():
+        if st.session_state.get("hotel_map") and st.session_state.hotel_map["points"]:
+            hotel_map = st.session_state.hotel_map
+            show_cluster_map(hotel_map["center"], ranked_points or hotel_map["points"])
+        else:
+            st.write("No hotels found to display on the map.")
+
+
+# Ranking of a hotel search against an event search and its map markers, cached across
+# reruns of the page
+@st.cache_data(max_entries=32)
+def hotel_event_ranking(hotels, events, radius_km, by):
+    ranking = proximity.rank_hotels(hotels, events, radius_km, by)
+    return ranking, maps.ranked_hotel_points(hotels, ranking, radius_km)
+
+
+# Function to rank the hotels of the last search by the events of the last Events page
+# search. Shows the ranking as a table and returns it as marker rows for the hotel map,
+# or None when there is nothing to rank.
+def show_event_ranking():
+    hotels = st.session_state.get("hotel_table")
+    if hotels is None or hotels.empty:
+        return None
+    st.subheader("Hotels Near Your Events")
+    events = st.session_state.get("events_table")
+    if events is None or events.empty:
+        st.info("Search for events on the Events page to rank these hotels by the events around them.")
+        return None
+
+    col1, col2 = st.columns(2)
+    with col1:
+        by = EVENT_RANKINGS[st.radio("Rank by", list(EVENT_RANKINGS), key="hotel_event_ranking")]
+    with col2:
+        radius_km = st.slider("Walking Distance (km)", 0.25, 3.0, proximity.DEFAULT_RADIUS_KM, step=0.25,
+                              key="hotel_event_radius")
+    ranking, ranked_points = hotel_event_ranking(hotels, events, radius_km, by)
+    if not ranking["events_nearby"].any():
+        st.info(f"None of the {len(events)} events of your last search are within {radius_km:g} km of these hotels.")
+
+    ranked = hotels[["name", "rating", "address"]].join(ranking).sort_values("rank")
+    ranked["average_km"] = ranked["nearby_km"] / ranked["events_nearby"].where(ranked["events_nearby"] > 0)
+    columns = ["rank", "name", "rating", "address", "events_nearby", "average_km"]
+    if by == proximity.RANK_BY_DISTANCE:
+        columns.append("total_km")
+    st.dataframe(
+        ranked[columns],
+        hide_index=True,
+        column_config={
+            "rank": st.column_config.NumberColumn("Rank"),
+            "name": "Hotel",
+            "rating": st.column_config.NumberColumn("Rating", format="%.1f ⭐"),
+            "address": "Address",
+            "events_nearby": st.column_config.NumberColumn(f"Events within {radius_km:g} km"),
+            "average_km": st.column_config.NumberColumn("Avg Walk (km)", format="%.2f"),
+            "total_km": st.column_config.NumberColumn(f"Total Distance to {len(events)} Events (km)", format="%.1f"),
+        },
+    )
+    return ranked_points
+
+
+# Function to run a coverage search, streaming hotels into the list and the map
+def search_hotels_coverage(city, city_lat, city_lng, area_km, max_requests, hotel_map_slot):
+    tiles = places.hotel_search_tiles(city_lat, city_lng, area_km * 1000)
+    budget = places.RequestBudget(max_requests)
+    status = st.empty()
+    results = st.empty()
+    hotels = []
+    failed_tiles = 0
+    last_map_update = time.perf_counter()
+    with st.spinner(f"Searching for hotels in {city}..."):
+        for searched, (new_hotels, failed) in enumerate(
+                places.iter_hotels_coverage(get_secret("google_key"), tiles, budget), start=1):
+            failed_tiles += failed
+            # The first page is shown while the search runs; the full list is paged after it
+            if new_hotels and len(hotels) < HOTELS_PER_PAGE:
+                first_page = (hotels + new_hotels)[:HOTELS_PER_PAGE]
+                thumbnails = load_hotel_thumbnails(first_page, budget)
+                with results.container():
+                    for hotel in first_page:
+                        display_hotel(hotel, thumbnails)
+            hotels.extend(new_hotels)
+            status.caption(f"Searched {searched} of {len(tiles)} areas: {len(hotels)} hotels, "
+                           f"{budget.used} of {budget.max_requests} requests used")
+            if new_hotels and time.perf_counter() - last_map_update > HOTEL_MAP_REFRESH_INTERVAL:
+                st.session_state.hotel_map = {"center": (city_lat, city_lng), "points": maps.hotel_points(hotels)}
+                show_hotel_map(hotel_map_slot)
+                last_map_update = time.perf_counter()
+    st.session_state.hotel_map = {"center": (city_lat, city_lng), "points": maps.hotel_points(hotels)}
+    st.session_state.hotel_table = build_hotel_table(hotels)
+    results.empty()
+    store_hotel_results(hotels, budget)
+    if failed_tiles:
+        st.warning(f"{failed_tiles} of {len(tiles)} search areas could not be retrieved.")
+    if budget.exhausted:
+        st.info("The request cap was reached before every area was searched completely.")
+    if not hotels:
+        st.warning("No hotels found for the selected dates and location.")
+
+
+# Hotels Page with Tabs for Search and Map
+def render():
+    st.title("🏨 Hotels - Find Accommodations")
+
+    # Create tabs for hotel search and map view
+    tab1, tab2 = st.tabs(["Search Hotels", "Map View"])
+
+    # The map slot exists before the search runs so a coverage search can stream into it
+    with tab2:
+        st.subheader("Hotel Map")
+        hotel_map_slot = st.empty()
+
+    # Tab 1: Hotel Search
+    with tab1:
+        st.subheader("Search Hotels")
+
+        # Input fields for city, start date, and end date on the Search Hotels tab
+        selected_city = city_search_box("Search for a City:", key="hotels_city",
+                                        default=get_city_index().default_city)
+
+        # The search form needs a city; earlier results below and on the map still show
+        if selected_city is not None:
+            city, city_lat, city_lng = selected_city.name, selected_city.lat, selected_city.lng
+
+            start_date = st.date_input("Start Date", datetime.now())
+            end_date = st.date_input("End Date", datetime.now() + timedelta(days=3))
+
+            # Coverage mode tiles the wider area instead of one 5 km search
+            coverage = st.checkbox("Full coverage: search the whole area tile by tile")
+            if coverage:
+                col1, col2 = st.columns(2)
+                with col1:
+                    area_km = st.slider("Search Radius (km)", 2, 25, 8)
+                with col2:
+                    max_requests = st.slider("Max Places Requests", 5, 200, places.MAX_HOTEL_REQUESTS,
+                                             help="Caps the API quota one search can use, hotel photos included")
+
+            # Check that the end date is not before the start date
+            if end_date < start_date:
+                st.error("End date cannot be before start date.")
+            elif st.button("Search Hotels"):
+                if coverage:
+                    search_hotels_coverage(city, city_lat, city_lng, area_km, max_requests, hotel_map_slot)
+                else:
+                    location = f"{city_lat:.5f},{city_lng:.5f}"
+                    with st.spinner(f"Searching for hotels in {city}..."):
+                        hotels = get_hotels(location)
+                        st.session_state.hotel_map = {"center": (city_lat, city_lng),
+                                                      "points": maps.hotel_points(hotels)}
+                        st.session_state.hotel_table = build_hotel_table(hotels)
+                        store_hotel_results(hotels)
+                        if not hotels:
+                            st.warning("No hotels found for the selected dates and location.")
+
+        show_hotel_list()
+        ranked_points = show_event_ranking()
+
+    # Tab 2: Map View
+    show_hotel_map(hotel_map_slot, ranked_points)
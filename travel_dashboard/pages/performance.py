@@ -0,0 +1,47 @@
+import pandas as pd
+import streamlit as st
+
+from travel_dashboard import metrics
+from travel_dashboard.api.rate_limit import get_rate_limiter
+
+
+# Function to tabulate the process-wide rate limit buckets
+def rate_limit_table():
+    rows = []
+    for state in get_rate_limiter().states():
+        rows.append({
+            "api": state["api"],
+            "tokens": f"{state['tokens']:.1f} / {state['burst']}",
+            "today": f"{state['quota_used']} / {state['daily_quota']}" if state["daily_quota"] else "",
+            "queued": sum(state["waiting"].values()),
+            "rejected": sum(state["rejections"].values()),
+        })
+    return pd.DataFrame(rows)
+
+
+# Function to show the current rerun's timing breakdown in the sidebar. Spans nest (an
+# API function includes its HTTP requests and the time they were queued by the rate
+# limiter), so totals of different kinds overlap.
+def display_performance_panel(trace):
+    spans = pd.DataFrame(trace.spans, columns=metrics.Span._fields)
+    with st.sidebar.expander("⏱️ Performance", expanded=True):
+        http = spans[spans["kind"] == "http"]
+        cache = spans[spans["kind"] == "cache"]
+        st.write(f"**Rerun:** {trace.elapsed() * 1000:.0f} ms")
+        st.write(f"**Upstream:** {len(http)} requests, {http['size'].fillna(0).sum() / 1024:.0f} KB")
+        if not cache.empty:
+            lookups = cache["status"].value_counts()
+            st.write("**Cache:** " + ", ".join(f"{count} {result}" for result, count in lookups.items()))
+        timed_spans = spans[spans["kind"] != "cache"]
+        if not timed_spans.empty:
+            breakdown = (timed_spans.groupby(["kind", "name"], as_index=False)
+                         .agg(calls=("seconds", "size"), total_ms=("seconds", "sum"), max_ms=("seconds", "max"))
+                         .sort_values("total_ms", ascending=False))
+            breakdown[["total_ms", "max_ms"]] *= 1000
+            st.dataframe(breakdown, hide_index=True,
+                         column_config={"total_ms": st.column_config.NumberColumn("total ms", format="%.1f"),
+                                        "max_ms": st.column_config.NumberColumn("max ms", format="%.1f")})
+        st.write("**Rate limits** (whole process)")
+        st.dataframe(rate_limit_table(), hide_index=True)
+        st.download_button("Download metrics (Prometheus)", metrics.registry.prometheus_text(),
+                           file_name="travel_dashboard_metrics.txt", mime="text/plain")
@@ -0,0 +1,226 @@
+import math
+from datetime import datetime, timedelta
+
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from travel_dashboard import metrics
+from travel_dashboard.api import openweather, rate_limit
+from travel_dashboard.data.city_index import city_label
+from travel_dashboard.data.forecast import rank_destinations, stack_daily
+from travel_dashboard.pages.common import (city_search_box, get_city_index, load_forecast, rate_limit_notice,
+                                           track_city, weather_icons)
+
+# Weather comparison across destinations
+MAX_COMPARE_CITIES = 20
+COMPARE_METRICS = {"Daily high (°C)": "temp_max", "Rain (mm)": "rain", "Wind speed (m/s)": "wind_speed"}
+
+
+# Function to get the forecast around a City record; its name is only a label, since
+# names such as Paris are ambiguous
+def get_weather_data(city):
+    track_city(city.name)
+    try:
+        weather_data = openweather.fetch_weather_data(city.name, near=(city.lat, city.lng))
+    except rate_limit.RateLimitError as error:
+        rate_limit_notice(error)
+        return None
+    if weather_data is None:
+        st.warning("Weather data could not be retrieved.")
+    return weather_data
+
+
+@metrics.timed("render")
+def display_three_day_outlook(weather_data):
+    st.write("### 3-Day Outlook")
+
+    # Extract 3-Day Forecast Data
+    daily = load_forecast(weather_data).daily.head(3)
+    dates = pd.to_datetime(daily["date"])
+    three_day_forecast = pd.DataFrame({
+        "Day": dates.dt.strftime("%A"),  #"Monday"
+        "Date": dates.dt.strftime("%B %d, %Y"),  #"November 18, 2024"
+        "Max Temp": daily["temp_max"].round().astype(int),
+        "Min Temp": daily["temp_min"].round().astype(int),
+        "Rain": daily["rain"].round(1),
+        "Weather": daily["description"].str.capitalize(),
+        "Icon": daily["description"].map(lambda desc: weather_icons.get(desc, ("🌤️", ""))[0]),
+    }).to_dict("records")
+
+    # Display Forecast in Three Columns
+    col1, col2, col3 = st.columns(3)
+    columns = [col1, col2, col3]
+
+    #Formatting styles for three day outlook on weather page
+    for col, day in zip(columns, three_day_forecast):
+        with col:
+            st.markdown(
+                f"""
+                <div style="
+                    border: 1px solid #d3d3d3; 
+                    padding: 10px; 
+                    margin-bottom: 10px; 
+                    border-radius: 5px; 
+                    text-align: center; 
+                    height: 220px;  /* Set a fixed height */
+                    display: flex; 
+                    flex-direction: column; 
+                    justify-content: space-between;
+                ">
+                <h4 style="margin: 0; font-size: 18px; color: #333;">{day['Day']}</h4>
+                <h5 style="margin: 0; font-size: 16px; color: #666;">{day['Date']}</h5>
+                <p style="margin: 4px 0; font-size: 14px;"><b>Max:</b> {day['Max Temp']}°C</p>
+                <p style="margin: 4px 0; font-size: 14px;"><b>Min:</b> {day['Min Temp']}°C</p>
+                <p style="margin: 4px 0; font-size: 14px;"><b>Rain:</b> {day['Rain']} mm</p>
+                <p style="margin: 4px 0; font-size: 14px;"><b>Weather:</b> {day['Weather']} {day['Icon']}</p>
+                </div>
+                """,
+                unsafe_allow_html=True
+            )
+
+
+@metrics.timed("render")
+def display_forecast_line_graph(weather_data):
+    st.write("### Weather Forecast (Next 24 Hours)")
+
+    # Filter to include only the next 24 hours
+    hourly = load_forecast(weather_data).hourly
+    current_time = pd.Timestamp.now(tz="UTC")
+    upcoming = hourly[hourly["time_utc"].between(current_time, current_time + pd.Timedelta(hours=24))]
+
+    # Convert to DataFrame for visualization
+    df_forecast = pd.DataFrame({
+        "Time": upcoming["local_time"].dt.strftime("%I %p"),
+        "Temperature (°C)": upcoming["temp"].round(),
+        "Rain (mm)": upcoming["rain"],
+        "Wind Speed (m/s)": upcoming["wind_speed"].round(1),
+    })
+
+    # Check if data is available for the next 24 hours
+    if not df_forecast.empty:
+        # Plot line graph for temperature, rain, and wind speed
+        fig = px.line(
+            df_forecast.melt(id_vars="Time"),  # Melt to plot multiple metrics
+            x="Time", y="value", color="variable",
+            title="Forecast Trends (Next 24 Hours)",
+            labels={"Time": "Time", "value": "Value", "variable": "Metric"}
+        )
+        fig.update_layout(xaxis_title="Time", yaxis_title="Forecast Values")
+        st.plotly_chart(fig)
+    else:
+        st.warning("No data available for the next 24 hours.")
+
+
+# Function for Long-Term Outlook
+@metrics.timed("render")
+def display_long_term_outlook(weather_data):
+    st.write("### Extended Weather Outlook (Up 5 days)")
+
+    # Daily extremes and totals for every day the forecast covers
+    daily = load_forecast(weather_data).daily.head(14)  #Two week forecast if data permits
+    df_long_term = pd.DataFrame({
+        "Date": daily["date"],
+        "Max Temp (°C)": daily["temp_max"].round().astype(int),
+        "Min Temp (°C)": daily["temp_min"].round().astype(int),
+        "Rain (mm)": daily["rain"].round(1),
+        "Wind Speed (m/s)": daily["wind_speed"].round(1),
+        "Humidity (%)": daily["humidity"].round().astype(int),
+        "Weather": daily["description"].str.capitalize(),
+    })
+
+    # Display the interactive table with travel-relevant components
+    st.dataframe(df_long_term, use_container_width=True)
+
+
+# Function to compare the forecasts of the selected destinations over the trip dates. The
+# destinations are City records, so namesakes such as Paris, France and Paris, Texas are
+# compared as two places.
+@metrics.timed("render")
+def display_weather_comparison():
+    candidate = city_search_box("Add a Destination:", key="compare_city")
+    selected = st.session_state.get("compare_cities", [])
+    if candidate is not None and st.button("Add to Comparison", disabled=len(selected) >= MAX_COMPARE_CITIES):
+        if candidate not in selected:
+            st.session_state.compare_cities = selected + [candidate]
+    cities = st.multiselect("Destinations", options=st.session_state.get("compare_cities", []),
+                            format_func=city_label, key="compare_cities", max_selections=MAX_COMPARE_CITIES)
+    if len(cities) < 2:
+        st.info("Add at least two destinations to compare them.")
+        return
+
+    today = datetime.now().date()
+    trip_dates = st.date_input("Trip Dates", value=(today, today + timedelta(days=4)),
+                               min_value=today, max_value=today + timedelta(days=5), key="compare_dates")
+    if len(trip_dates) != 2:
+        return
+    start_date, end_date = trip_dates
+
+    for city in cities:
+        track_city(city.name)
+    forecasts = openweather.fetch_weather_many(cities)
+    refusals = [error for error in forecasts.values() if isinstance(error, rate_limit.RateLimitError)]
+    if refusals:
+        rate_limit_notice(refusals[0])
+    forecasts = {city: weather_data for city, weather_data in forecasts.items()
+                 if not isinstance(weather_data, rate_limit.RateLimitError)}
+    failed = [city_label(city) for city, weather_data in forecasts.items() if weather_data is None]
+    if failed:
+        st.warning(f"Weather data could not be retrieved for {', '.join(failed)}.")
+    stacked = stack_daily({city_label(city): load_forecast(weather_data).daily
+                           for city, weather_data in forecasts.items() if weather_data is not None})
+    ranking = rank_destinations(stacked, start_date, end_date)
+    if ranking.empty:
+        st.write("No forecast data for the selected dates.")
+        return
+
+    st.write(f"### Destinations Ranked for {start_date:%b %d} - {end_date:%b %d}")
+    st.dataframe(
+        ranking.drop(columns=["score"]),
+        hide_index=True,
+        column_config={
+            "rank": st.column_config.NumberColumn("Rank"),
+            "city": "City",
+            "rain": st.column_config.NumberColumn("Total Rain (mm)", format="%.1f"),
+            "temp_max": st.column_config.NumberColumn("Avg High (°C)", format="%.1f"),
+            "temp_min": st.column_config.NumberColumn("Avg Low (°C)", format="%.1f"),
+            "wind_speed": st.column_config.NumberColumn("Max Wind (m/s)", format="%.1f"),
+            "dry_days": st.column_config.NumberColumn("Dry Days"),
+            "days": st.column_config.NumberColumn("Days"),
+        },
+    )
+
+    metric = st.radio("Compare", list(COMPARE_METRICS), horizontal=True, key="compare_metric")
+    trip = stacked[stacked["date"].between(str(start_date), str(end_date))]
+    fig = px.bar(trip, x="date", y=COMPARE_METRICS[metric], facet_col="city", facet_col_wrap=4,
+                 category_orders={"city": list(ranking["city"])},
+                 labels={"date": "Date", COMPARE_METRICS[metric]: metric}, height=250 * math.ceil(len(ranking) / 4))
+    fig.for_each_annotation(lambda annotation: annotation.update(text=annotation.text.split("=")[-1]))
+    st.plotly_chart(fig)
+
+
+def render():
+    st.title("🌦️ Weather Forecast - Check Weather")
+    forecast_tab, compare_tab = st.tabs(["Forecast", "Compare Destinations"])
+    with forecast_tab:
+        # Prefill city selection with the City record in session state, or the largest city
+        last_city = st.session_state.get("selected_city")
+        selected_city = city_search_box("Search for a City:", key="weather_city",
+                                        default=last_city.name if last_city else get_city_index().default_city)
+        if selected_city is not None:
+            st.session_state.selected_city = selected_city
+            weather_data = get_weather_data(selected_city)
+            if weather_data:
+                st.subheader(f"Weather Forecast for {selected_city.name}")
+
+                # Display 3-Day Outlook
+                display_three_day_outlook(weather_data)
+
+                # Display Hourly Forecast
+                display_forecast_line_graph(weather_data)
+
+                # Display Long-Term Outlook
+                display_long_term_outlook(weather_data)
+
+    with compare_tab:
+        display_weather_comparison()
@@ -0,0 +1,253 @@
+import argparse
+import os
+import threading
+import time
+from collections import deque, namedtuple
+from datetime import date, datetime, timedelta
+
+from travel_dashboard import metrics
+from travel_dashboard.api import http_client, openweather, rate_limit, ticketmaster
+from travel_dashboard.api.response_cache import CACHE_POLICIES
+from travel_dashboard.api.usage import get_usage_store
+from travel_dashboard.data.city_index import read_cities
+
+# Background cache warmer for popular destinations. It keeps the response cache warm for
+# the top-N cities of the usage store (lookups over the last week, shared by every
+# process using the cache directory):
+#   - weather forecasts are refreshed every 3 hours, shortly after OpenWeather publishes
+#     a new forecast step, and
+#   - the next EVENT_DAYS days of Ticketmaster events in every category are refreshed
+#     once a day during the off-peak hours.
+# The pages look cities up by coordinates, so every city is warmed around the
+# coordinates of its most populous namesake in worldcities.csv (by name when the table
+# is missing).
+# Its requests are marked as background work (http_client.background) and share an
+# hourly budget. A request is refused once the budget is spent, when interactive
+# sessions used the same API within the busy window, or when the rate limiter has no
+# token for it at background priority; the warmer then backs off exponentially and
+# resumes where it left off, since entries it already refreshed are cache hits. Run it
+# inside the app (TRAVEL_DASHBOARD_WARMER=1) or as a separate worker sharing the cache
+# directory:
+#
+#   python -m travel_dashboard.warmer --top-n 100 --budget 300 --off-peak 1-5
+
+CITIES_CSV = "worldcities.csv"
+
+WarmerConfig = namedtuple("WarmerConfig", ["top_n", "budget_per_hour", "off_peak_hours", "busy_requests",
+                                           "busy_window"])
+
+WEATHER_STEP = 3 * 3600  # OpenWeather forecast steps start at 00:00, 03:00, ... UTC
+WEATHER_STEP_DELAY = 10 * 60  # seconds after a step before its forecast is fetched
+EVENT_DAYS = 7
+POLL_INTERVAL = 300  # seconds between checks while idle
+MIN_BACKOFF = 30
+MAX_BACKOFF = 30 * 60
+
+
+# Function to parse an off-peak window such as "2-6" (local hours, end exclusive)
+def parse_hours(text):
+    start, end = (int(hour) % 24 for hour in text.split("-"))
+    return start, end
+
+
+def config_from_env():
+    return WarmerConfig(
+        top_n=int(os.environ.get("TRAVEL_DASHBOARD_WARMER_TOP_N", 50)),
+        budget_per_hour=int(os.environ.get("TRAVEL_DASHBOARD_WARMER_BUDGET", 200)),
+        off_peak_hours=parse_hours(os.environ.get("TRAVEL_DASHBOARD_WARMER_OFF_PEAK", "2-6")),
+        busy_requests=int(os.environ.get("TRAVEL_DASHBOARD_WARMER_BUSY_REQUESTS", 1)),
+        busy_window=int(os.environ.get("TRAVEL_DASHBOARD_WARMER_BUSY_WINDOW", 60)),
+    )
+
+
+# Function to map every city name to the (lat, lng) of its most populous namesake, or to
+# nothing when the city table cannot be read
+def load_city_coordinates(csv_path=CITIES_CSV):
+    try:
+        frame = read_cities(csv_path)
+    except (OSError, ValueError):
+        return {}
+    # Rows are ordered by population, so the first row of a name is its largest city
+    frame = frame.drop_duplicates("city")
+    return {city: (float(lat), float(lng)) for city, lat, lng in zip(frame["city"], frame["lat"], frame["lng"])}
+
+
+# Hourly request allowance of the warmer. refusal tells why the last request was
+# refused: "budget" when the allowance of the last hour is spent, "busy" when
+# interactive sessions sent busy_requests or more requests to the API recently, or the
+# rate limiter's reason when the API's token bucket or daily quota had nothing left.
+class WarmerBudget:
+    def __init__(self, config, usage):
+        self.config = config
+        self.usage = usage
+        self.refusal = None
+        self._sent = deque()  # monotonic times of the requests of the last hour
+        self._lock = threading.Lock()
+
+    def take(self, api):
+        now = time.monotonic()
+        with self._lock:
+            while self._sent and now - self._sent[0] > 3600:
+                self._sent.popleft()
+            if len(self._sent) >= self.config.budget_per_hour:
+                self.refusal = "budget"
+                return False
+            if self.usage.recent_requests(self.config.busy_window, api) >= self.config.busy_requests:
+                self.refusal = "busy"
+                return False
+            self._sent.append(now)
+            return True
+
+    def refuse(self, reason):
+        self.refusal = reason
+
+    def used(self):
+        with self._lock:
+            return len(self._sent)
+
+
+class CacheWarmer:
+    def __init__(self, config, usage=None):
+        self.config = config
+        self.usage = usage or get_usage_store()
+        self.budget = WarmerBudget(config, self.usage)
+        self.coordinates = None  # city name -> (lat, lng), loaded on the first run
+        self.next_weather = 0.0  # time.time() of the next weather refresh
+        self.events_warmed_on = None  # day of the last complete events refresh
+        self.backoff = 0
+        self.resume_at = 0.0
+        self.last_cycle = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def off_peak(self, now):
+        start, end = self.config.off_peak_hours
+        return start <= now.hour < end if start <= end else (now.hour >= start or now.hour < end)
+
+    def _record(self, kind, result):
+        metrics.registry.inc("warmer_refreshes_total", {"kind": kind, "result": result})
+        self.last_cycle[result] = self.last_cycle.get(result, 0) + 1
+
+    # Function to refresh the forecasts that predate the latest forecast step. Returns
+    # False when the budget or interactive traffic stopped it before the last city.
+    def warm_weather(self, cities):
+        max_age = (time.time() - WEATHER_STEP_DELAY) % WEATHER_STEP
+        for city in cities:
+            self.budget.refusal = None
+            try:
+                with http_client.background(self.budget):
+                    weather_data = openweather.fetch_weather_data(city, max_age=max_age,
+                                                                  near=self.coordinates.get(city))
+            except rate_limit.RateLimitError:
+                weather_data = None  # the budget was told why
+            if self.budget.refusal:
+                self._record("weather", "deferred")
+                return False
+            self._record("weather", "ok" if weather_data is not None else "failed")
+        return True
+
+    # Function to refresh the events of the next EVENT_DAYS days in every category, with
+    # the same dates the Events page searches by default
+    def warm_events(self, cities):
+        start_date = date.today()
+        end_date = start_date + timedelta(days=EVENT_DAYS)
+        for city in cities:
+            self.budget.refusal = None
+            with http_client.background(self.budget):
+                _, failed_pages = ticketmaster.fetch_all_events(city, start_date, end_date, ticketmaster.CATEGORIES,
+                                                                max_age=CACHE_POLICIES["ticketmaster"].ttl,
+                                                                near=self.coordinates.get(city))
+            if self.budget.refusal:
+                self._record("events", "deferred")
+                return False
+            self._record("events", "failed" if failed_pages else "ok")
+        return True
+
+    # Function to run whatever is due. Returns the number of seconds until it should be
+    # called again.
+    def run_pending(self):
+        now = time.time()
+        if now < self.resume_at:
+            return self.resume_at - now
+        self.last_cycle = {}
+        if self.coordinates is None:
+            self.coordinates = load_city_coordinates()
+        cities = [city for city, _ in self.usage.top_cities(self.config.top_n)]
+        completed = True
+        if now >= self.next_weather:
+            completed = self.warm_weather(cities)
+            if completed:
+                self.next_weather = now - (now - WEATHER_STEP_DELAY) % WEATHER_STEP + WEATHER_STEP
+        today = date.today()
+        if completed and self.events_warmed_on != today and self.off_peak(datetime.now()):
+            completed = self.warm_events(cities)
+            if completed:
+                self.events_warmed_on = today
+
+        if not completed:
+            self.backoff = min(max(self.backoff * 2, MIN_BACKOFF), MAX_BACKOFF)
+            self.resume_at = time.time() + self.backoff
+            return self.backoff
+        self.backoff = 0
+        return max(1.0, min(self.next_weather - time.time(), POLL_INTERVAL))
+
+    def run_forever(self):
+        while not self._stop.is_set():
+            try:
+                delay = self.run_pending()
+            except Exception:
+                # e.g. missing credentials or a locked database; try again later
+                self.backoff = min(max(self.backoff * 2, MIN_BACKOFF), MAX_BACKOFF)
+                delay = self.backoff
+            self._stop.wait(delay)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run_forever, name="cache-warmer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+_warmer = None
+_warmer_lock = threading.Lock()
+
+
+# Function to start the warmer once per process, configured from the environment
+def start_in_process():
+    global _warmer
+    with _warmer_lock:
+        if _warmer is None:
+            _warmer = CacheWarmer(config_from_env()).start()
+        return _warmer
+
+
+def main():
+    defaults = config_from_env()
+    parser = argparse.ArgumentParser(description="Keep the response cache warm for popular destinations.")
+    parser.add_argument("--top-n", type=int, default=defaults.top_n, help="number of cities kept warm")
+    parser.add_argument("--budget", type=int, default=defaults.budget_per_hour, help="upstream requests per hour")
+    parser.add_argument("--off-peak", default="-".join(map(str, defaults.off_peak_hours)),
+                        help="local hours for the events refresh, e.g. 2-6")
+    parser.add_argument("--busy-requests", type=int, default=defaults.busy_requests,
+                        help="interactive requests per API within the busy window that pause the warmer")
+    parser.add_argument("--busy-window", type=int, default=defaults.busy_window, help="seconds")
+    parser.add_argument("--once", action="store_true", help="run what is due once and exit")
+    args = parser.parse_args()
+
+    config = WarmerConfig(top_n=args.top_n, budget_per_hour=args.budget, off_peak_hours=parse_hours(args.off_peak),
+                          busy_requests=args.busy_requests, busy_window=args.busy_window)
+    warmer = CacheWarmer(config)
+    while True:
+        delay = warmer.run_pending()
+        if warmer.last_cycle:
+            print(f"{datetime.now():%Y-%m-%d %H:%M:%S} {warmer.last_cycle} "
+                  f"({warmer.budget.used()} of {config.budget_per_hour} requests used this hour)", flush=True)
+        if args.once:
+            break
+        time.sleep(delay)
+
+
+if __name__ == "__main__":
+    main()